@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+"""
+Benchmark for batch tile updates on GameDisplay.
+
+Opens a square region of tiles on a headless GameDisplay three ways: one
+set_tile call per tile (one on_set_tile trigger and one draw each), one
+set_tiles call, and one set_board call with the whole board. Prints the time
+per update and how many triggers fired.
+
+Run from the repository root: python3 benchmarks/batch_tiles.py [WxH] [region]
+"""
+
+import contextlib, io, os, sys, time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'mods'))
+
+import pysweep.mod as mod
+from pysweep.headless import HeadlessMaster
+from pysweep.pysweep import PySweep
+from gamedisplay import GameDisplay
+from gamedisplay.state import TileState
+
+class Counter(mod.Mod):
+    def __init__(self):
+        self.events = 0
+
+    @mod.listen('GameDisplay', 'on_set_tile')
+    def on_set_tile(self, event):
+        self.events += 1
+
+    @mod.listen('GameDisplay', 'on_set_tiles')
+    def on_set_tiles(self, event):
+        self.events += 1
+
+def region_states(size, state):
+    return [((row, col), state) for row in range(size) for col in range(size)]
+
+def main():
+    boardsize = tuple(int(n) for n in sys.argv[1].split('x')) if len(sys.argv) > 1 else (30, 16)
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else min(boardsize)
+    master = HeadlessMaster()
+    gamedisplay = GameDisplay()
+    gamedisplay.boardsize = boardsize
+    counter = Counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        PySweep(master, mods={'GameDisplay': gamedisplay, 'Counter': counter})
+    master.update()
+
+    def one_by_one(changes):
+        for index, state in changes:
+            gamedisplay.set_tile(None, index, state)
+
+    def batch(changes):
+        gamedisplay.set_tiles(None, changes)
+
+    def board(changes):
+        tiles = gamedisplay.get_board()
+        for (row, col), state in changes:
+            tiles[row][col] = state
+        gamedisplay.set_board(None, tiles)
+
+    print("{}x{} board, opening {}x{} = {} tiles".format(boardsize[0], boardsize[1], size, size, size * size))
+    states = [TileState.Number[0], TileState.Unopened]
+    for name, update in (('set_tile', one_by_one), ('set_tiles', batch), ('set_board', board)):
+        repeat = 10
+        elapsed = 0
+        counter.events = 0
+        for i in range(repeat):
+            changes = region_states(size, states[i % 2])
+            start = time.perf_counter()
+            update(changes)
+            master.update()
+            elapsed += time.perf_counter() - start
+        print("{:<10} {:>9.2f} ms/update  {:>6.0f} triggers/update".format(
+            name, elapsed / repeat * 1000, counter.events / repeat))
+
+if __name__ == '__main__':
+    main()
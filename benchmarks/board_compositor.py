@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""
+Drawing benchmark for the NumPy board compositor.
+
+For a few board sizes, times a full redraw of the board (every tile set to
+a random state, then drawn and presented) with BoardTiles, which pastes one
+tile at a time, and with CompositedBoardTiles (gamedisplay.compositor). Both
+draw on an OffscreenCanvas. Needs NumPy for the second.
+
+Boards of 1000x1000 need a few GB of memory: the display is 16000x16000
+pixels with the default skin, and a full redraw with CompositedBoardTiles
+renders the board into a buffer that size before pasting it.
+
+Run from the repository root: python3 benchmarks/board_compositor.py [WxH ...]
+"""
+
+import os, random, sys, time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'mods'))
+
+from pysweep.headless import HeadlessMaster
+import gamedisplay.compositor
+from gamedisplay.displayimages import DisplayImages
+from gamedisplay.gamedisplay import OffscreenCanvas
+from gamedisplay.state import TileState
+
+STATES = [TileState.Number[i] for i in range(9)] + [TileState.Flag, TileState.Unopened, TileState.Mine]
+
+def run(images, boardsize, composited, repeat):
+    gamedisplay.compositor.enabled = composited
+    master = HeadlessMaster()
+    start = time.perf_counter()
+    canvas = OffscreenCanvas(master, boardsize, 3, 3, images)
+    master.update()
+    built = time.perf_counter() - start
+    tiles = canvas.display.children['board'].children['tiles']
+
+    rng = random.Random(0)
+    indexes = [(row, col) for row in range(boardsize[1]) for col in range(boardsize[0])]
+    elapsed = 0
+    for i in range(repeat):
+        for index in indexes:
+            tiles.set_tile(index, rng.choice(STATES))
+        start = time.perf_counter()
+        tiles.draw()
+        master.update()
+        elapsed += time.perf_counter() - start
+    print("{:>9} {:<22} {:>10.1f} ms/redraw  (built in {:.0f} ms)".format(
+        '{}x{}'.format(*boardsize), type(tiles).__name__, elapsed / repeat * 1000, built * 1000))
+
+def main():
+    sizes = [tuple(int(n) for n in arg.split('x')) for arg in sys.argv[1:]]
+    if not sizes:
+        sizes = [(30, 16), (200, 200), (1000, 1000)]
+    images = DisplayImages('images')
+    for boardsize in sizes:
+        repeat = max(1, min(20, 200000 // (boardsize[0] * boardsize[1])))
+        run(images, boardsize, False, repeat)
+        if gamedisplay.compositor.numpy is None:
+            print("{:>9} NumPy isn't installed, skipping CompositedBoardTiles".format(''))
+        else:
+            run(images, boardsize, True, repeat)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""
+Memory and time benchmark for the tile storage of the board.
+
+For a few board sizes, builds the class Board draws its tiles with
+(Board.tiles_class: CompositedBoardTiles if NumPy is installed and the skin is
+opaque, otherwise BoardTiles) on its own, with no display to draw on, so only
+the storage of the tiles is measured. Prints how long that
+took and how much memory it holds on to, in total and per tile, as traced by
+tracemalloc (on a second build, since tracing slows it down). Then times
+setting every tile with set_board and reading them back with get_board.
+BoardTiles is measured too if Board doesn't pick it.
+
+Run from the repository root: python3 benchmarks/board_tiles.py [WxH ...]
+"""
+
+import gc, os, sys, time, tracemalloc
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'mods'))
+
+from gamedisplay.displayimages import DisplayImages
+from gamedisplay.gamedisplay import Board, BoardTiles
+from gamedisplay.state import TileState
+
+def run(images, boardsize, tilesclass):
+    insize = images.board.getinsize(boardsize)
+    cells = boardsize[0] * boardsize[1]
+
+    start = time.perf_counter()
+    tiles = tilesclass(None, (0, 0), insize, images.board.tile, boardsize)
+    built = time.perf_counter() - start
+    del tiles
+
+    gc.collect()
+    tracemalloc.start()
+    tiles = tilesclass(None, (0, 0), insize, images.board.tile, boardsize)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    board = [[TileState.Number[(row + col) % 9] for col in range(boardsize[0])] for row in range(boardsize[1])]
+    start = time.perf_counter()
+    tiles.set_board(board)
+    set_board = time.perf_counter() - start
+    start = time.perf_counter()
+    tiles.get_board()
+    get_board = time.perf_counter() - start
+
+    print("{:>9} {:<20}  built in {:>8.1f} ms  {:>10,.0f} KiB {:>7.1f} B/tile  set_board {:>7.1f} ms  get_board {:>7.1f} ms".format(
+        '{}x{}'.format(*boardsize), tilesclass.__name__, built * 1000, size / 1024, size / cells,
+        set_board * 1000, get_board * 1000))
+
+def main():
+    sizes = [tuple(int(n) for n in arg.split('x')) for arg in sys.argv[1:]]
+    if not sizes:
+        sizes = [(30, 16), (200, 200), (1000, 1000)]
+    images = DisplayImages('images')
+    classes = [Board.tiles_class(images.board.tile)]
+    if classes[0] is not BoardTiles:
+        classes.append(BoardTiles)
+    for boardsize in sizes:
+        for tilesclass in classes:
+            run(images, boardsize, tilesclass)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""
+Presentation benchmark for the display's dirty rectangles.
+
+Draws a 30x16 display, then changes one tile, a row of tiles, scattered
+tiles and everything (a forced redraw), one frame each, and prints how many
+pixels (and bytes of RGBA) each frame presented against the whole display.
+If Tk can open a window, the frames go to a DisplayCanvas and are timed too;
+otherwise they go to an OffscreenCanvas.
+
+Run from the repository root: python3 benchmarks/dirty_rects.py [frames]
+"""
+
+import os, random, sys, time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'mods'))
+
+import tkinter
+
+from pysweep.headless import HeadlessMaster
+from gamedisplay.displayimages import DisplayImages
+from gamedisplay.gamedisplay import DisplayCanvas, OffscreenCanvas
+from gamedisplay.state import TileState
+
+def one_tile(rng):
+    return [(rng.randrange(16), rng.randrange(30))]
+
+def row(rng):
+    r = rng.randrange(16)
+    return [(r, col) for col in range(30)]
+
+def scattered(rng):
+    return [(rng.randrange(16), rng.randrange(30)) for i in range(20)]
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    try:
+        master = tkinter.Tk()
+        canvas = DisplayCanvas(master, (30, 16), 3, 3, DisplayImages('images'))
+        canvas.pack()
+        pump = master.update
+        where = 'Tk'
+    except tkinter.TclError:
+        master = HeadlessMaster()
+        canvas = OffscreenCanvas(master, (30, 16), 3, 3, DisplayImages('images'))
+        pump = master.update
+        where = 'offscreen'
+    pump()
+    tiles = canvas.display.children['board'].children['tiles']
+    full = canvas.size[0] * canvas.size[1]
+    rng = random.Random(0)
+    states = [TileState.Number[i] for i in range(9)] + [TileState.Flag, TileState.Unopened]
+
+    print("{} display, {}x{} = {:,} pixels".format(where, canvas.size[0], canvas.size[1], full))
+    for name, change in (('one tile', one_tile), ('row', row), ('scattered', scattered), ('everything', None)):
+        pixels = 0
+        start = time.perf_counter()
+        for i in range(n):
+            if change is None:
+                canvas.draw(True)
+            else:
+                for index in change(rng):
+                    tiles.set_tile(index, rng.choice(states))
+                canvas.draw()
+            pump()
+            pixels += canvas.presented
+        elapsed = time.perf_counter() - start
+        print("{:<10} {:>9,.0f} px/frame  {:>9,.1f} KiB/frame  {:>5.1f}% of the display  {:>7.3f} ms/frame".format(
+            name, pixels / n, pixels * 4 / n / 1024, pixels / n / full * 100, elapsed / n * 1000))
+
+if __name__ == '__main__':
+    main()
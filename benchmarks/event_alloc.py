@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""
+Allocation benchmark for input events.
+
+Feeds a synthetic stream of Tk events (mostly <Motion>, with a button press
+and release every so often) through TkinterListener and Clicker, with and
+without event pools. Each mode runs in its own process so peak RSS can be
+compared.
+
+Run from the repository root: python3 benchmarks/event_alloc.py [events]
+"""
+
+import os, sys, resource, subprocess, time
+from types import SimpleNamespace
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'mods'))
+
+from pysweep.pysweep import PySweep
+from pysweep.headless import HeadlessMaster
+
+def run(n, pooled):
+    from tkinterlistener import TkinterListener
+    from clicker import Clicker
+
+    listener = TkinterListener()
+    clicker = Clicker()
+    created = [0]
+    listener.pool_events = clicker.pool_events = pooled
+    if not pooled:
+        # Count allocations the same way the pools do.
+        def counting(cls):
+            def new(*args):
+                created[0] += 1
+                return cls(*args)
+            return new
+        listener.new_event = counting(listener.new_event)
+        clicker.new_event = counting(clicker.new_event)
+    master = HeadlessMaster()
+    PySweep(master, mods={'TkinterListener': listener, 'Clicker': clicker})
+
+    motion = ('event', '<Motion>')
+    press = ('event', '<ButtonPress-1>')
+    release = ('event', '<ButtonRelease-1>')
+    tkevent = SimpleNamespace(x=0, y=0, x_root=0, y_root=0, char='')
+
+    start = time.perf_counter()
+    for i in range(n):
+        tkevent.x_root = i & 1023
+        if i % 100 == 0:
+            listener.handle_event(press, tkevent)
+        elif i % 100 == 50:
+            listener.handle_event(release, tkevent)
+        else:
+            listener.handle_event(motion, tkevent)
+    master.update()
+    elapsed = time.perf_counter() - start
+
+    if pooled:
+        allocated = listener.eventpool.allocated + clicker.eventpool.allocated
+        recycled = listener.eventpool.recycled + clicker.eventpool.recycled
+    else:
+        allocated = created[0]
+        recycled = 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # KiB on Linux
+    print("{:<10} {:>10,} events {:>8.2f}s {:>12,} allocated {:>12,} recycled {:>10,} KiB peak RSS".format(
+        'pooled' if pooled else 'unpooled', n, elapsed, allocated, recycled, peak))
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    for mode in ('unpooled', 'pooled'):
+        subprocess.check_call([sys.executable, __file__, str(n), mode])
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        run(int(sys.argv[1]), sys.argv[2] == 'pooled')
+    else:
+        main()
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+Hit testing benchmark.
+
+For a few board sizes, lays out a display on an OffscreenCanvas and times
+finding the part under random points of it, first by searching the parts
+(Part.get_part_containing, what Display used to do) and then with the
+display's HitIndex (Display.hit_test), which also finds the tile. Checks
+that both find the same parts, and that the tiles are where they're drawn.
+
+Run from the repository root: python3 benchmarks/hit_test.py [WxH ...]
+"""
+
+import os, random, sys, time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'mods'))
+
+from pysweep.headless import HeadlessMaster
+from gamedisplay.displayimages import DisplayImages
+from gamedisplay.gamedisplay import OffscreenCanvas, Part
+
+def run(images, boardsize, n):
+    canvas = OffscreenCanvas(HeadlessMaster(), boardsize, 3, 3, images)
+    display = canvas.display
+    start = time.perf_counter()
+    display.index_parts()
+    indexed = time.perf_counter() - start
+
+    rng = random.Random(0)
+    points = [(rng.randrange(canvas.size[0]), rng.randrange(canvas.size[1])) for i in range(n)]
+
+    start = time.perf_counter()
+    searched = [Part.get_part_containing(display, point) for point in points]
+    search = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hits = [display.hit_test(point) for point in points]
+    lookup = time.perf_counter() - start
+
+    tiles = display.children['board'].children['tiles']
+    for point, part, (hit, tile) in zip(points, searched, hits):
+        assert part is hit, (point, part, hit)
+        if tile is not None:
+            row, col = tile
+            x = tiles.position[0] + col * tiles.images.size[0]
+            y = tiles.position[1] + row * tiles.images.size[1]
+            assert 0 <= point[0] - x < tiles.images.size[0] and 0 <= point[1] - y < tiles.images.size[1], (point, tile)
+
+    print("{:>9}  search {:>6.2f} us/point  HitIndex {:>6.2f} us/point  (indexed in {:.1f} ms)".format(
+        '{}x{}'.format(*boardsize), search / n * 1e6, lookup / n * 1e6, indexed * 1000))
+
+def main():
+    sizes = [tuple(int(n) for n in arg.split('x')) for arg in sys.argv[1:]]
+    if not sizes:
+        sizes = [(9, 9), (30, 16), (200, 200)]
+    images = DisplayImages('images')
+    for boardsize in sizes:
+        run(images, boardsize, 100000)
+
+if __name__ == '__main__':
+    main()
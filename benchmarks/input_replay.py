@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""
+Replays an input log (see pysweep.inputlog) through TkinterListener and
+Clicker and reports events/sec. Without a log, a synthetic one is recorded
+first.
+
+Run from the repository root:
+    python3 benchmarks/input_replay.py [LOG] [--realtime]
+"""
+
+import os, sys, tempfile, time
+from types import SimpleNamespace
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'mods'))
+
+from pysweep.pysweep import PySweep
+from pysweep.headless import HeadlessMaster
+from pysweep.inputlog import InputRecorder, InputLog, replay
+
+def synthesize(path, n=100000):
+    recorder = InputRecorder(path)
+    for i in range(n):
+        event = SimpleNamespace(x=i % 500, y=i % 300, x_root=i % 500, y_root=i % 300, char='??')
+        if i % 100 == 0:
+            recorder.record(('event', '<ButtonPress-1>'), event)
+        elif i % 100 == 50:
+            recorder.record(('event', '<ButtonRelease-1>'), event)
+        else:
+            recorder.record(('event', '<Motion>'), event)
+    recorder.close()
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    realtime = '--realtime' in sys.argv
+    if args:
+        path = args[0]
+    else:
+        path = os.path.join(tempfile.mkdtemp(), 'input.log')
+        synthesize(path)
+
+    from tkinterlistener import TkinterListener
+    from clicker import Clicker
+    master = HeadlessMaster()
+    app = PySweep(master, mods={'TkinterListener': TkinterListener(), 'Clicker': Clicker()})
+
+    log = InputLog(path)
+    start = time.perf_counter()
+    count = replay(app.mods['TkinterListener'], log, realtime=realtime, pump=master.update)
+    elapsed = time.perf_counter() - start
+    print("Replayed {:,} events from {} in {:.2f}s ({:,.0f} events/sec)".format(
+        count, path, elapsed, count / elapsed))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""
+Startup benchmark for lazy mod activation.
+
+Makes a folder of core mods and a big folder of user mods that each listen to
+one of the core triggers, then times starting PySweep with every mod loaded
+up front and with lazy=True (after a first start that fills in the manifest).
+Each start runs in a fresh interpreter so nothing is imported already.
+
+Run from the repository root: python3 benchmarks/lazy_startup.py [user mods]
+"""
+
+import contextlib, io, os, sys, subprocess, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CORE = '''
+import pysweep.mod as mod
+from pysweep.event import SlottedEvent
+
+class CoreEvent(SlottedEvent):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        SlottedEvent.__init__(self)
+        self.value = value
+
+class Core{i}(mod.Mod):
+    @mod.trigger
+    def fire(self, value):
+        return None, CoreEvent(value)
+'''
+
+USER = '''
+import collections, json, pysweep.mod as mod
+
+class User{i}(mod.Mod):
+    def __init__(self):
+        self.seen = collections.Counter()
+
+    @mod.listen('Core{core}', 'fire')
+    def listen(self, event):
+        self.seen[event.value] += 1
+'''
+
+# Some bulk so importing a user mod costs about what a real one would
+HELPERS = ''.join('''
+    def helper{j}(self, value):
+        return json.dumps({{'value': value, 'n': {j}}})
+'''.format(j=j) for j in range(20))
+
+def make_mods(root, n, cores=4):
+    os.makedirs(os.path.join(root, 'core'))
+    os.makedirs(os.path.join(root, 'user'))
+    for i in range(cores):
+        with open(os.path.join(root, 'core', 'core{}.py'.format(i)), 'w') as f:
+            f.write(CORE.format(i=i))
+    for i in range(n):
+        with open(os.path.join(root, 'user', 'user{}.py'.format(i)), 'w') as f:
+            f.write(USER.format(i=i, core=i % cores) + HELPERS)
+
+def run(root, mode):
+    import pysweep.modloader as modloader
+    from pysweep.pysweep import PySweep
+
+    paths = (os.path.join(root, 'core'),)
+    lazy_paths = (os.path.join(root, 'user'),)
+    manifest_path = os.path.join(root, 'discovery.json')
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'eager':
+            mods = modloader.load_mods_in(*(paths + lazy_paths), manifest_path=manifest_path)
+            app = PySweep(None, mods=mods)
+        else:
+            mods, lazy = modloader.load_mods_lazily(paths, lazy_paths, manifest_path)
+            app = PySweep(None, mods=mods, lazy=lazy)
+    elapsed = time.perf_counter() - start
+    print("{:<8} {:>8.1f} ms  {} mods started, {} modules imported".format(
+        mode, elapsed * 1000, len(app.mods), len(sys.modules)))
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        make_mods(tmp, n)
+        for mode in ('eager', 'lazy', 'lazy'): # The first lazy start fills in the manifest
+            subprocess.check_call([sys.executable, __file__, tmp, mode])
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        run(sys.argv[1], sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+"""
+Compares listeners that check event attributes themselves with listeners
+that declare the same check with @mod.listen(..., where=...).
+
+Six listeners each care about one button/action pair of a trigger that fires
+for every button and action. Reports events/sec and the number of Python
+function calls made per event.
+
+Then does the same count for the real input stack (TkinterListener, Clicker,
+ClickManager and GameDisplay on a HeadlessMaster) with a stream of a drag,
+keys that aren't Clicker's and a key click.
+
+Run from the repository root: python3 benchmarks/listener_predicates.py
+"""
+
+import os, sys, timeit
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'mods'))
+
+import contextlib, io
+
+import pysweep.mod as mod
+from pysweep.event import SlottedEvent
+from pysweep.headless import HeadlessMaster
+from pysweep.pysweep import PySweep
+
+class InputEvent(SlottedEvent):
+    __slots__ = ('button', 'action')
+
+    def __init__(self, button, action):
+        SlottedEvent.__init__(self)
+        self.button = button
+        self.action = action
+
+class Source(mod.Mod):
+    @mod.trigger(eventnode=False)
+    def input(self, event, button, action): return event, InputEvent(button, action)
+
+def branching_listener(button, action):
+    def listener(self, event):
+        if event.button != button or event.action != action:
+            return
+        self.n += 1
+    return mod.listen('Source', 'input')(listener)
+
+def filtered_listener(button, action):
+    def listener(self, event):
+        self.n += 1
+    return mod.listen('Source', 'input', where={'button': button, 'action': action})(listener)
+
+pairs = [(button, action) for button in 'LR' for action in 'DMU']
+
+def make_sink(listener):
+    attrs = {'n': 0}
+    for button, action in pairs:
+        attrs['on_' + button + action] = listener(button, action)
+    return type('Sink', (mod.Mod,), attrs)
+
+def setup(listener):
+    return PySweep(None, mods={'Source': Source(), 'Sink': make_sink(listener)()}).mods['Source']
+
+stream = [(button, action) for button in 'LMR' for action in 'MMMMMMDU']
+
+def run_stream(source):
+    for button, action in stream:
+        source.input(None, button, action)
+
+def count_calls(run, *args):
+    calls = [0]
+    def profile(frame, event, arg):
+        if event == 'call':
+            calls[0] += 1
+    sys.setprofile(profile)
+    run(*args)
+    sys.setprofile(None)
+    return calls[0]
+
+tk_stream = ([('<ButtonPress-1>', {})] + [('<Motion>', {})] * 50 + [('<ButtonRelease-1>', {})] +
+    [('<KeyPress>', {'char': 'a'}), ('<KeyRelease>', {'char': 'a'})] * 10 +
+    [('<KeyPress>', {'char': '1'}), ('<KeyRelease>', {'char': '1'})])
+
+def run_tk_stream(master):
+    for i, (sequence, kwargs) in enumerate(tk_stream):
+        x = 20 + i % 7
+        master.event_generate(sequence, x=x, y=90, x_root=x, y_root=90, **kwargs)
+    master.update()
+
+def real_stack():
+    from tkinterlistener import TkinterListener
+    from clicker import Clicker
+    from clickmanager import ClickManager
+    from gamedisplay import GameDisplay
+    master = HeadlessMaster()
+    with contextlib.redirect_stdout(io.StringIO()):
+        PySweep(master, mods={
+            'TkinterListener': TkinterListener(),
+            'Clicker': Clicker(),
+            'ClickManager': ClickManager(),
+            'GameDisplay': GameDisplay(),
+        })
+    master.update()
+    run_tk_stream(master) # Bind everything first
+    print("{:<10} {:>30.2f} Python calls/event".format(
+        'mod stack', count_calls(run_tk_stream, master) / len(tk_stream)))
+
+def main():
+    for name, listener in (('branching', branching_listener), ('where=', filtered_listener)):
+        source = setup(listener)
+        timer = timeit.Timer('run_stream(source)', globals={'run_stream': run_stream, 'source': source})
+        best = min(timer.repeat(number=2000, repeat=7))
+        print("{:<10} {:>12,.0f} events/sec {:>6.2f} Python calls/event".format(
+            name, 2000 * len(stream) / best, count_calls(run_stream, source) / len(stream)))
+    real_stack()
+
+if __name__ == '__main__':
+    main()
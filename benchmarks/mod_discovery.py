@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""
+Startup benchmark for mod discovery on a synthetic tree of mods.
+
+Compares the old walk (which compares every hit against everything found so
+far with os.path.samefile) with find_modules without a manifest and with an
+up to date manifest.
+
+Run from the repository root: python3 benchmarks/mod_discovery.py [mods]
+"""
+
+import contextlib, io, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pysweep.modloader as modloader
+
+def make_tree(root, n, per_dir=50):
+    for i in range(n):
+        d = os.path.join(root, 'group{}'.format(i // per_dir))
+        os.makedirs(d, exist_ok=True)
+        if i % 10 == 0:
+            os.makedirs(os.path.join(d, 'pkg{}'.format(i)))
+            open(os.path.join(d, 'pkg{}'.format(i), '__init__.py'), 'w').close()
+        else:
+            open(os.path.join(d, 'mod{}.py'.format(i)), 'w').close()
+
+def old_find_modules_r(path, alreadyfound):
+    """
+    What find_modules_r used to do, minus the printing.
+    """
+    module_path_dict = {}
+    for module_path in os.listdir(path):
+        module_path = os.path.join(path, module_path)
+        if os.path.isdir(module_path) and not modloader.ignore_dir(module_path):
+            for found in alreadyfound:
+                if os.path.samefile(module_path, found):
+                    break
+            else:
+                alreadyfound.append(module_path)
+                if modloader.is_package_module(module_path):
+                    module_path_dict[os.path.basename(module_path)] = module_path
+                else:
+                    module_path_dict.update(old_find_modules_r(module_path, alreadyfound))
+        elif os.path.isfile(module_path) and not modloader.ignore_file(module_path):
+            for found in alreadyfound:
+                if os.path.samefile(module_path, found):
+                    break
+            else:
+                alreadyfound.append(module_path)
+                if modloader.is_file_module(module_path):
+                    module_path_dict[os.path.basename(module_path)[:-3]] = module_path
+    return module_path_dict
+
+def timed(name, func):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        found = func()
+    print("{:<24} {:>10.1f} ms  ({} modules)".format(name, (time.perf_counter() - start) * 1000, len(found)))
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1200
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'mods')
+        make_tree(root, n)
+        manifest_path = os.path.join(tmp, 'discovery.json')
+
+        timed("old walk", lambda: old_find_modules_r(root, []))
+        timed("walk, no manifest", lambda: modloader.find_modules(root))
+        manifest = modloader.load_manifest(manifest_path)
+        timed("walk, saving manifest", lambda: modloader.find_modules(root, None, manifest))
+        modloader.save_manifest(manifest_path, manifest)
+        timed("manifest up to date", lambda: modloader.find_modules(
+            root, None, modloader.load_manifest(manifest_path)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+Import benchmark for the mod loader's bytecode caching.
+
+Makes a folder of synthetic mods (files and packages with submodules) and
+times import_modules on it in a fresh interpreter: first with no
+__pycache__ (everything is compiled and the bytecode written), then warm
+(the cached bytecode is validated and used), then twice with bytecode
+caching off for comparison. The manifest (which remembers what every mod imports, so
+the sources don't have to be parsed again) is kept between runs.
+
+Run from the repository root: python3 benchmarks/mod_import.py [mods]
+"""
+
+import contextlib, io, os, sys, subprocess, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MOD = '''
+import collections, json
+import pysweep.mod as mod
+
+class Mod{i}(mod.Mod):
+    def __init__(self):
+        self.seen = collections.Counter()
+''' + ''.join('''
+    def helper{j}(self, value):
+        if value > {j}:
+            return json.dumps({{'value': value, 'n': {j}}})
+        return [x * {j} for x in range(value)]
+'''.format(j=j) for j in range(40))
+
+def make_mods(root, n):
+    os.makedirs(root, exist_ok=True)
+    for i in range(n):
+        if i % 10 == 0:
+            package = os.path.join(root, 'pkg{}'.format(i))
+            os.makedirs(package)
+            with open(os.path.join(package, '__init__.py'), 'w') as f:
+                f.write('from pkg{0}.impl import Mod{0}\n'.format(i))
+            with open(os.path.join(package, 'impl.py'), 'w') as f:
+                f.write(MOD.replace('{i}', str(i)))
+        else:
+            with open(os.path.join(root, 'mod{}.py'.format(i)), 'w') as f:
+                f.write(MOD.replace('{i}', str(i)))
+
+def run(root, mode):
+    if mode == 'no cache':
+        sys.dont_write_bytecode = True
+    import pysweep.modloader as modloader
+
+    manifest_path = os.path.join(root, 'discovery.json')
+    with contextlib.redirect_stdout(io.StringIO()):
+        manifest = modloader.load_manifest(manifest_path)
+        module_path_dict = modloader.find_modules(root, None, manifest)
+        start = time.perf_counter()
+        name_module_dict = modloader.import_modules(module_path_dict, manifest)
+        elapsed = time.perf_counter() - start
+        modloader.save_manifest(manifest_path, manifest)
+    cached = sum(len(files) for dirpath, dirnames, files in os.walk(root)
+        if os.path.basename(dirpath) == '__pycache__')
+    print("{:<10} {:>8.1f} ms  {} modules, {} files in __pycache__".format(
+        mode, elapsed * 1000, len(name_module_dict), cached))
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        cached = os.path.join(tmp, 'cached')
+        uncached = os.path.join(tmp, 'uncached')
+        make_mods(cached, n)
+        make_mods(uncached, n)
+        env = dict(os.environ)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        for root, mode in ((cached, 'cold'), (cached, 'warm'), (cached, 'warm'), (uncached, 'no cache'), (uncached, 'no cache')):
+            subprocess.check_call([sys.executable, __file__, root, mode], env=env)
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        run(sys.argv[1], sys.argv[2])
+    else:
+        main()
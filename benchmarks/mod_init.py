@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+"""
+Startup benchmark for the reflection done on mod classes.
+
+Makes a lot of mod classes with a few triggers, listeners, plain methods and
+properties each, then times checking them with ismod and running
+pysweep_triggers_init and pysweep_listeners_init on an instance of each: the
+old way (inspect.getmembers on the class and on every instance) against the
+metadata Mod.__init_subclass__ caches on each class.
+
+Run from the repository root: python3 benchmarks/mod_init.py [mods]
+"""
+
+import inspect, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pysweep.mod as mod
+
+class Registry(mod.Mod):
+    """
+    Stands in for every mod being listened to, and counts registrations.
+    """
+    def __init__(self):
+        self.registered = 0
+
+    def pysweep_register(self, trigger, func, deferred=None, where=None):
+        self.registered += 1
+
+class FakePySweep:
+    def __init__(self):
+        self.registry = Registry()
+        self.mods = {'Registry': self.registry}
+
+def make_class(i):
+    namespace = {}
+    for j in range(5):
+        namespace['fire{}'.format(j)] = mod.trigger(lambda self: (None, None))
+        namespace['listen{}'.format(j)] = mod.listen('Registry', 'fire{}'.format(j))(lambda self, event: None)
+    for j in range(30):
+        namespace['helper{}'.format(j)] = lambda self: None
+    # getmembers on an instance evaluates every property, which is part of
+    # what it costs.
+    for j in range(5):
+        namespace['prop{}'.format(j)] = property(lambda self: 0)
+    return type('Mod{}'.format(i), (mod.Mod,), namespace)
+
+def old_ismod(cl):
+    modset = {fname for fname, _ in inspect.getmembers(mod.Mod, predicate=inspect.isfunction)}
+    clset = {fname for fname, _ in inspect.getmembers(cl, predicate=inspect.isfunction)}
+    missing = modset - clset
+    return len(missing) == 0, missing
+
+def old_triggers_init(self):
+    self.pysweep_triggers = {}
+    for funcname, func in inspect.getmembers(self, predicate=inspect.ismethod):
+        try:
+            func.pysweep_is_trigger
+        except:
+            continue
+        if func.pysweep_is_trigger:
+            self.pysweep_triggers[func.__name__] = []
+
+def old_listeners_init(self):
+    for funcname, func in inspect.getmembers(self, predicate=inspect.ismethod):
+        try:
+            func.pysweep_listening_to
+        except:
+            continue
+        for modname, trigger, options in func.pysweep_listening_to:
+            self.pysweep.mods[modname].pysweep_register(trigger, func, **options)
+
+def timed(name, classes, check, triggers_init, listeners_init):
+    pysweep = FakePySweep()
+    start = time.perf_counter()
+    for cl in classes:
+        assert check(cl)[0]
+        instance = cl()
+        instance.pysweep = pysweep
+        triggers_init(instance)
+        listeners_init(instance)
+    elapsed = time.perf_counter() - start
+    print("{:<10} {:>8.1f} ms  ({} classes, {} listeners)".format(
+        name, elapsed * 1000, len(classes), pysweep.registry.registered))
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    start = time.perf_counter()
+    classes = [make_class(i) for i in range(n)]
+    print("{:<10} {:>8.1f} ms  (class creation, including __init_subclass__)".format(
+        'classes', (time.perf_counter() - start) * 1000))
+    timed('old', classes, old_ismod, old_triggers_init, old_listeners_init)
+    timed('cached', classes, mod.ismod, mod.Mod.pysweep_triggers_init, mod.Mod.pysweep_listeners_init)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""
+Microbenchmark for @mod.trigger dispatch.
+
+Fires a Clicker-like motion trigger with two listeners and reports events/sec
+with the plain trigger wrappers, with compiled triggers, and with compiled
+triggers that skip EventNode construction.
+
+Run from the repository root: python3 benchmarks/trigger_dispatch.py
+"""
+
+import os, sys, timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pysweep.mod as mod
+from pysweep.event import Event
+from pysweep.pysweep import PySweep
+
+class MoveEvent(Event):
+    def __init__(self, position):
+        Event.__init__(self)
+        self.position = position
+
+class Source(mod.Mod):
+    @mod.trigger
+    def move(self, event): return event, MoveEvent((1, 2))
+
+    @mod.trigger(eventnode=False)
+    def move_nonode(self, event): return event, MoveEvent((1, 2))
+
+class Sink(mod.Mod):
+    def __init__(self):
+        self.n = 0
+
+    @mod.listen('Source', 'move')
+    @mod.listen('Source', 'move_nonode')
+    def a(self, event):
+        self.n += 1
+
+    @mod.listen('Source', 'move')
+    @mod.listen('Source', 'move_nonode')
+    def b(self, event):
+        self.n += 1
+
+def setup(compiled):
+    mods = {'Source': Source(), 'Sink': Sink()}
+    return PySweep(None, compile_triggers=compiled, mods=mods).mods['Source']
+
+def run(name, trigger, number):
+    timer = timeit.Timer('trigger(None)', globals={'trigger': trigger})
+    best = min(timer.repeat(number=number, repeat=15))
+    print("{:<28} {:>12,.0f} events/sec".format(name, number / best))
+
+def main():
+    number = 50000
+    plain = setup(False)
+    compiled = setup(True)
+    run("plain", plain.move, number)
+    run("plain, no EventNode", plain.move_nonode, number)
+    run("compiled", compiled.move, number)
+    run("compiled, no EventNode", compiled.move_nonode, number)
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,95 @@
 #!/usr/bin/python3
 
+import argparse
+import time
+
 from pysweep.pysweep import PySweep
+from pysweep.headless import HeadlessMaster
+from pysweep.inputlog import InputLog, replay
+import pysweep.profile
+import pysweep.trace
+
+def feed_synthetic_events(master, n):
+    """
+    Generate n mouse events sweeping across the display, mostly motion with
+    a left click every 100 events, 1 ms of virtual time apart.
+    """
+    for i in range(n):
+        x = i % 500
+        y = (i // 500) % 300
+        if i % 100 == 0:
+            sequence = '<ButtonPress-1>'
+        elif i % 100 == 50:
+            sequence = '<ButtonRelease-1>'
+        else:
+            sequence = '<Motion>'
+        master.event_generate(sequence, x=x, y=y, x_root=x, y_root=y)
+        master.advance(1)
+    return n
+
+def frames(app):
+    """
+    How many frames the display presented, and how many pixels that was.
+    """
+    gamedisplay = app.mods.get('GameDisplay')
+    if gamedisplay is None:
+        return 0, 0
+    return gamedisplay.displaycanvas.frames, gamedisplay.displaycanvas.presented_total
 
 def main():
-    app = PySweep(None)
+    parser = argparse.ArgumentParser(description='PySweeper without a window')
+    parser.add_argument('--profile-listeners', action='store_true',
+        help='time every mod listener and print a table on exit')
+    parser.add_argument('--profile-json', metavar='PATH',
+        help='like --profile-listeners, but also write the results to PATH as JSON')
+    parser.add_argument('--trace', metavar='PATH',
+        help='write every listener call to PATH as a Chrome trace-event file')
+    parser.add_argument('--replay', metavar='PATH',
+        help='feed the input log at PATH (see --record in main.py) through the mods')
+    parser.add_argument('--realtime', action='store_true',
+        help='with --replay, space the events out the way they were recorded')
+    parser.add_argument('--events', type=int, default=0, metavar='N',
+        help='feed N synthetic mouse events through the mods')
+    parser.add_argument('--screenshot', metavar='PATH',
+        help='save what the display looks like at the end to PATH')
+    parser.add_argument('--memory', action='store_true',
+        help='print the memory held by each mod after starting and again at the end')
+    args = parser.parse_args()
+
+    master = HeadlessMaster()
+    app = PySweep(master, account_memory=args.memory)
+    if args.memory:
+        master.event_generate('<F12>') # Same as pressing F12 in main.py
+    profiler = None
+    if args.profile_listeners or args.profile_json:
+        profiler = pysweep.profile.ListenerProfiler()
+        app.add_instrument(profiler)
+    tracer = None
+    if args.trace:
+        tracer = pysweep.trace.ChromeTracer(args.trace)
+        app.add_instrument(tracer)
+
+    count = 0
+    start = time.perf_counter()
+    if args.replay:
+        count += replay(app.mods['TkinterListener'], InputLog(args.replay),
+            realtime=args.realtime, pump=lambda: master.advance(1))
+    if args.events:
+        count += feed_synthetic_events(master, args.events)
+    master.update()
+    elapsed = time.perf_counter() - start
+    if count:
+        print("Handled {:,} events in {:.2f}s ({:,.0f} events/sec, {:,} frames, {:,} pixels presented)".format(
+            count, elapsed, count / elapsed, *frames(app)))
+    if args.screenshot:
+        app.mods['GameDisplay'].displaycanvas.save(args.screenshot)
+    if args.memory:
+        master.event_generate('<F12>')
+
+    if profiler is not None:
+        pysweep.profile.dump(profiler, args.profile_json)
+    if tracer is not None:
+        tracer.close()
 
 if __name__ == '__main__':
     main()
@@ -1,25 +1,64 @@
 #!/usr/bin/python3
 
 import os, platform
+import argparse
 import tkinter
 
 from pysweep.pysweep import PySweep
+import pysweep.profile
+import pysweep.trace
+import pysweep.reload
 
 def pushwindowtotop():
     if platform.system() == 'Darwin':  # How Mac OS X is identified by Python
         os.system('''/usr/bin/osascript -e 'tell app "Finder" to set frontmost of process "Python" to true' ''')
 
 def main():
+    parser = argparse.ArgumentParser(description='PySweeper')
+    parser.add_argument('--profile-listeners', action='store_true',
+        help='time every mod listener and print a table on exit')
+    parser.add_argument('--profile-json', metavar='PATH',
+        help='like --profile-listeners, but also write the results to PATH as JSON')
+    parser.add_argument('--trace', metavar='PATH',
+        help='write every listener call to PATH as a Chrome trace-event file')
+    parser.add_argument('--record', metavar='PATH',
+        help='append every Tk event to the binary input log at PATH')
+    parser.add_argument('--lazy-mods', action='store_true',
+        help="only import the mods in ~/.pysweeper/mods once they're needed")
+    parser.add_argument('--reload', action='store_true',
+        help='reload mods when their source files change')
+    parser.add_argument('--memory', action='store_true',
+        help='trace memory from the start, and show what each mod holds on F12')
+    args = parser.parse_args()
+
     root = tkinter.Tk()
     root.title('PySweeper')
     root.grab_set()
-    app = PySweep(root)
+    app = PySweep(root, lazy=args.lazy_mods, account_memory=args.memory)
+    profiler = None
+    if args.profile_listeners or args.profile_json:
+        profiler = pysweep.profile.ListenerProfiler()
+        app.add_instrument(profiler)
+    tracer = None
+    if args.trace:
+        tracer = pysweep.trace.ChromeTracer(args.trace)
+        app.add_instrument(tracer)
+    if args.record:
+        app.mods['TkinterListener'].start_recording(args.record)
+    if args.reload:
+        pysweep.reload.ModReloader(app).start()
     pushwindowtotop()
     root.mainloop()
     try:
         root.destroy()
     except tkinter.TclError as e:
         pass
+    if profiler is not None:
+        pysweep.profile.dump(profiler, args.profile_json)
+    if tracer is not None:
+        tracer.close()
+    if args.record:
+        app.mods['TkinterListener'].stop_recording()
 
 if __name__ == '__main__':
     main()
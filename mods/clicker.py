@@ -1,7 +1,7 @@
 import platform
 
 import pysweep.mod as mod
-from pysweep.event import Event
+from pysweep.event import SlottedEvent, EventPool, hold, release
 
 class ButtonState:
     """
@@ -45,21 +45,27 @@ class ButtonAction:
 
     @classmethod
     def from_button_action(cls, button, action):
-        if action == Action.D:
-            return (cls.D, cls.LD, cls.MD, cls.RD)[button.n+1]
-        elif action == Action.M:
-            return (cls.M, cls.LM, cls.MM, cls.RM)[button.n+1]
-        elif action == Action.U:
-            return (cls.U, cls.LU, cls.MU, cls.RU)[button.n+1]
-        else:
+        try:
+            return cls.table[action][button.n+1]
+        except (KeyError, IndexError):
             raise ValueError('Invalid button/action combination ({}, {})'.format(button, action))
 
+# Built once so from_button_action doesn't have to build a tuple every time.
+ButtonAction.table = {
+    Action.D: (ButtonAction.D, ButtonAction.LD, ButtonAction.MD, ButtonAction.RD),
+    Action.M: (ButtonAction.M, ButtonAction.LM, ButtonAction.MM, ButtonAction.RM),
+    Action.U: (ButtonAction.U, ButtonAction.LU, ButtonAction.MU, ButtonAction.RU),
+}
+
 class InputType:
     class Keyboard: pass
     class Mouse: pass
 
-class ClickerEvent(Event):
+class ClickerEvent(SlottedEvent):
+    __slots__ = ('button', 'action', 'buttonaction', 'root_position', 'state')
+
     def __init__(self, button, action, root_position, state):
+        SlottedEvent.__init__(self)
         self.button = button
         self.action = action
         self.buttonaction = ButtonAction.from_button_action(self.button, self.action)
@@ -87,6 +93,18 @@ class Clicker(mod.Mod):
         self.state = [ButtonState.Released] * 3
         self.root_position = (0, 0) # Relative to screen
 
+        # Set to True to recycle ClickerEvents through an EventPool once their
+        # trigger is done with them and nothing holds them any more, instead
+        # of allocating one per trigger.
+        self.pool_events = False
+        self.new_event = ClickerEvent
+
+    def pysweep_init(self, pysweep):
+        mod.Mod.pysweep_init(self, pysweep)
+        if self.pool_events:
+            self.eventpool = EventPool(ClickerEvent)
+            self.new_event = self.eventpool.new
+
     @mod.listen("TkinterListener", "<Motion>")
     def motion(self, event):
         self.root_position = (event.event.x_root, event.event.y_root)
@@ -146,14 +164,18 @@ class Clicker(mod.Mod):
             self.mouse_state[button.n] = ButtonState.Released
         elif inputtype == InputType.Keyboard:
             self.key_state[button.n] = ButtonState.Releasing
+            hold(event) # Until actuallykeyup
             self.pysweep.master.after(0, lambda event=event,button=button: self.actuallykeyup(event, button))
         else:
             raise ValueError("{} is not an InputType.".format(inputtype))
         self.up(event, button)
     def actuallykeyup(self, event, button):
-        if self.key_state[button.n] == ButtonState.Releasing:
-            self.key_state[button.n] = ButtonState.Released
-        self.up(event, button)
+        try:
+            if self.key_state[button.n] == ButtonState.Releasing:
+                self.key_state[button.n] = ButtonState.Released
+            self.up(event, button)
+        finally:
+            release(event)
     def up(self, event, button):
         self.state[button.n] = max(self.mouse_state[button.n], self.key_state[button.n])
         if self.state[button.n] == ButtonState.Released:
@@ -163,32 +185,32 @@ class Clicker(mod.Mod):
             if button == Button.R: self.RU(event)
 
     @mod.trigger
-    def D(self, event): return event, ClickerEvent(Button.Any, Action.D, self.root_position, self.state)
-    @mod.trigger
-    def M(self, event): return event, ClickerEvent(Button.Any, Action.M, self.root_position, self.state)
+    def D(self, event): return event, self.new_event(Button.Any, Action.D, self.root_position, self.state)
+    @mod.trigger(eventnode=False)
+    def M(self, event): return event, self.new_event(Button.Any, Action.M, self.root_position, self.state)
     @mod.trigger
-    def U(self, event): return event, ClickerEvent(Button.Any, Action.U, self.root_position, self.state)
+    def U(self, event): return event, self.new_event(Button.Any, Action.U, self.root_position, self.state)
 
     @mod.trigger
-    def LD(self, event): return event, ClickerEvent(Button.L, Action.D, self.root_position, self.state)
+    def LD(self, event): return event, self.new_event(Button.L, Action.D, self.root_position, self.state)
+    @mod.trigger(eventnode=False)
+    def LM(self, event): return event, self.new_event(Button.L, Action.M, self.root_position, self.state)
     @mod.trigger
-    def LM(self, event): return event, ClickerEvent(Button.L, Action.M, self.root_position, self.state)
-    @mod.trigger
-    def LU(self, event): return event, ClickerEvent(Button.L, Action.U, self.root_position, self.state)
+    def LU(self, event): return event, self.new_event(Button.L, Action.U, self.root_position, self.state)
 
     @mod.trigger
-    def MD(self, event): return event, ClickerEvent(Button.M, Action.D, self.root_position, self.state)
-    @mod.trigger
-    def MM(self, event): return event, ClickerEvent(Button.M, Action.M, self.root_position, self.state)
+    def MD(self, event): return event, self.new_event(Button.M, Action.D, self.root_position, self.state)
+    @mod.trigger(eventnode=False)
+    def MM(self, event): return event, self.new_event(Button.M, Action.M, self.root_position, self.state)
     @mod.trigger
-    def MU(self, event): return event, ClickerEvent(Button.M, Action.U, self.root_position, self.state)
+    def MU(self, event): return event, self.new_event(Button.M, Action.U, self.root_position, self.state)
 
     @mod.trigger
-    def RD(self, event): return event, ClickerEvent(Button.R, Action.D, self.root_position, self.state)
-    @mod.trigger
-    def RM(self, event): return event, ClickerEvent(Button.R, Action.M, self.root_position, self.state)
+    def RD(self, event): return event, self.new_event(Button.R, Action.D, self.root_position, self.state)
+    @mod.trigger(eventnode=False)
+    def RM(self, event): return event, self.new_event(Button.R, Action.M, self.root_position, self.state)
     @mod.trigger
-    def RU(self, event): return event, ClickerEvent(Button.R, Action.U, self.root_position, self.state)
+    def RU(self, event): return event, self.new_event(Button.R, Action.U, self.root_position, self.state)
 
     # @mod.listen('Clicker', 'D')
     # @mod.listen('Clicker', 'M')
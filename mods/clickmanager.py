@@ -93,24 +93,38 @@ class ClickManager(mod.Mod):
     def pysweep_finish_init(self):
         self.displaycanvas = self.pysweep.mods['GameDisplay'].displaycanvas
 
+    # Motion can't change the click mode (that takes a button going down or
+    # up), so process_click only hears about presses and releases, and
+    # motion only needs to know what's under the cursor.
     @mod.listen('Clicker', 'LD')
-    @mod.listen('Clicker', 'LM')
     @mod.listen('Clicker', 'LU')
     @mod.listen('Clicker', 'MD')
-    @mod.listen('Clicker', 'MM')
     @mod.listen('Clicker', 'MU')
     @mod.listen('Clicker', 'RD')
-    @mod.listen('Clicker', 'RM')
     @mod.listen('Clicker', 'RU')
     def listen(self, clickerevent):
         clickaction = self.process_click(clickerevent)
         # print("{!s:>50} : {!s}".format(self.clickmode, clickaction))
+        self.hit_test(clickerevent)
+
+    @mod.listen('Clicker', 'LM')
+    @mod.listen('Clicker', 'MM')
+    @mod.listen('Clicker', 'RM')
+    def drag(self, clickerevent):
+        self.hit_test(clickerevent)
+
+    def hit_test(self, clickerevent):
+        """
+        Returns the part under the cursor and, if that's the board tiles, the
+        (row, col) of the tile, otherwise None.
+        """
         eventpos = (
             clickerevent.root_position[0] - self.displaycanvas.winfo_rootx(),
             clickerevent.root_position[1] - self.displaycanvas.winfo_rooty(),
         )
-        partcontaining = self.displaycanvas.display.get_part_containing(eventpos)
-        # print(partcontaining, eventpos, partcontaining.position, partcontaining.size)
+        partcontaining, tile = self.displaycanvas.display.hit_test(eventpos)
+        # print(partcontaining, tile, eventpos)
+        return partcontaining, tile
 
     def process_click(self, clickerevent):
         if self.clickmode == ClickMode.Released:
@@ -0,0 +1,79 @@
+"""
+Drawing the board with NumPy, if it's installed.
+
+A BoardCompositor reads the state of every tile straight from the bytearray
+of codes gamedisplay.gamedisplay.BoardTiles keeps, through a 2D NumPy view of
+it, and keeps the tile images stacked in one array. Drawing a region of the board is then one
+indexing operation per row of pixels in a tile, into a buffer the size of
+that region, instead of one PIL paste per tile. The result goes onto the
+display as one image (see gamedisplay.gamedisplay.CompositedBoardTiles).
+
+Tiles are copied, not blended, so this is only used when every tile image
+is opaque (see usable).
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from PIL import Image
+
+# Set to False to draw the board tile by tile even if NumPy is installed.
+enabled = True
+
+def usable(tileimages):
+    """
+    Returns True if the compositor is enabled, NumPy is installed and every
+    image in tileimages (a gamedisplay.displayimages.TileImages) is opaque.
+    """
+    if not enabled or numpy is None:
+        return False
+    for img in tileimages.i.values():
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+        if img.getextrema()[3][0] != 255:
+            return False
+    return True
+
+class BoardCompositor:
+    def __init__(self, sprites, tilesize, boardsize, codes):
+        """
+        sprites: the tile images, in the order of their codes (see
+        gamedisplay.gamedisplay.TILE_CODES).
+        tilesize: (width, height) of every tile image.
+        boardsize: (columns, rows)
+        codes: a bytearray of the code of every tile, row by row. Changes to
+        it are seen by render, but it can't be resized.
+        """
+        self.tilesize = tilesize
+        self.boardsize = boardsize
+        width, height = tilesize
+        columns, rows = boardsize
+
+        sprites = numpy.stack([numpy.asarray(img.convert('RGBA')) for img in sprites])
+
+        # One row of pixels of a tile is a single numpy.void element, so each
+        # row of pixels in the board is filled by one numpy.take of codes.
+        self.pixelrow = numpy.dtype((numpy.void, width * 4))
+        self.spriterows = [
+            numpy.ascontiguousarray(sprites[:, y]).reshape(len(sprites), width * 4).view(self.pixelrow).reshape(len(sprites))
+            for y in range(height)]
+
+        self.states = numpy.frombuffer(codes, dtype=numpy.uint8).reshape(rows, columns)
+
+    def render(self, box):
+        """
+        Draw the tiles in box (first row, first column, last row + 1, last
+        column + 1) into a new buffer that size, and return it as an image.
+        """
+        row0, col0, row1, col1 = box
+        rows, columns = row1 - row0, col1 - col0
+        width, height = self.tilesize
+        states = self.states[row0:row1, col0:col1].astype(numpy.intp)
+        buffer = numpy.empty((rows * height, columns * width, 4), dtype=numpy.uint8)
+        # As [row][y][column] of rows of tile pixels
+        tilerows = buffer.reshape(rows, height, columns, width * 4).view(self.pixelrow).reshape(rows, height, columns)
+        for y, spriterow in enumerate(self.spriterows):
+            numpy.take(spriterow, states, out=tilerows[:, y], mode='clip')
+        return Image.frombuffer('RGBA', (columns * width, rows * height), buffer, 'raw', 'RGBA', 0, 1)
@@ -124,10 +124,12 @@ class BorderImages:
         self.size = (self.thickness[1]+self.thickness[2], self.thickness[0]+self.thickness[3])
 
     def __getattr__(self, key):
-        if key in self.keys:
+        # Looked up in __dict__ so this works before __init__ has set
+        # self.keys.
+        if key in self.__dict__.get('keys', ()):
             return self.i[key]
         else:
-            raise KeyError('{} is not a member of {}'.format(key, self))
+            raise AttributeError('{} is not a member of {}'.format(key, self))
 
 class PanelImages:
     """
@@ -252,10 +254,10 @@ class FaceImages(SpriteImages):
         SpriteImages.__init__(self, self.keys, image_dir, default_image_dir)
 
     def __getattr__(self, key):
-        if key in self.keys:
+        if key in self.__dict__.get('keys', ()):
             return self.i[key]
         else:
-            raise KeyError('{} is not a face image'.format(key, self))
+            raise AttributeError('{} is not a face image'.format(key, self))
 
 class BoardImages:
     """
@@ -305,7 +307,7 @@ class TileImages(SpriteImages):
         self.n = [self.i[n] for n in range(9)]
 
     def __getattr__(self, key):
-        if key == self.keys:
+        if key in self.__dict__.get('keys', ()):
             return self.i[key]
         else:
-            raise KeyError('{} is not a tile image'.format(key, self))
+            raise AttributeError('{} is not a tile image'.format(key, self))
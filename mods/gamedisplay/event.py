@@ -1,8 +1,10 @@
-from pysweep.event import Event
+from pysweep.event import SlottedEvent
+
+class DisplayEvent(SlottedEvent):
+    __slots__ = ('part', 'args')
 
-class DisplayEvent(Event):
     def __init__(self, part, *args):
-        Event.__init__(self)
+        SlottedEvent.__init__(self)
         self.part = part
         self.args = args
 
@@ -7,11 +7,28 @@ import tkinter
 from gamedisplay.displayimages import DisplayImages
 from gamedisplay.event import DisplayEvent
 from gamedisplay.state import TileState, FaceState
+import gamedisplay.compositor
 
 import pysweep.pos as pos
 import pysweep.mod as mod
 # from pysweep.event import Event
 
+# The image in the skin (see displayimages.TileImages) of every TileState
+TILE_IMAGES = {
+    TileState.Mine:      'mine',
+    TileState.Blast:     'blast',
+    TileState.Flag:      'flag',
+    TileState.FlagWrong: 'flag_wrong',
+    TileState.Unopened:  'unopened',
+}
+for _i in range(9):
+    TILE_IMAGES[TileState.Number[_i]] = _i
+del _i
+
+# Every TileState by code (the byte the board tiles keep for a tile), and back
+TILE_STATES = list(TILE_IMAGES)
+TILE_CODES = {state: code for code, state in enumerate(TILE_STATES)}
+
 class GameDisplay(mod.Mod):
     def __init__(self):
         # Expose the state enums for other mods to see and use
@@ -32,7 +49,11 @@ class GameDisplay(mod.Mod):
         other mods (namely ClickManager) can figure out where mouse events
         are.
         """
-        self.displaycanvas = DisplayCanvas(self.pysweep.master, self.boardsize, self.lcounterlength, self.rcounterlength, self.images)
+        if getattr(self.pysweep.master, 'headless', False):
+            canvasclass = OffscreenCanvas
+        else:
+            canvasclass = DisplayCanvas
+        self.displaycanvas = canvasclass(self.pysweep.master, self.boardsize, self.lcounterlength, self.rcounterlength, self.images)
         self.displaycanvas.pack()
 
         self.pysweep.master.update_idletasks()
@@ -51,18 +72,52 @@ class GameDisplay(mod.Mod):
     def set_lcounter(self, event, value):
         if self.displaycanvas.set_lcounter(value):
             self.on_set_lcounter(event, value)
-            self.displaycanvas.draw()
+            self.draw()
     def set_face(self, event, face):
         if self.displaycanvas.set_face(face):
             self.on_set_face(event, face)
-            self.displaycanvas.draw()
+            self.draw()
     def set_rcounter(self, event, value):
         if self.displaycanvas.set_rcounter(value):
             self.on_set_rcounter(event, value)
-            self.displaycanvas.draw()
+            self.draw()
     def set_tile(self, event, index, tile):
+        """
+        Set the tile at index (row, column) to a TileState.
+        """
         if self.displaycanvas.set_tile(index, tile):
             self.on_set_tile(event, index, tile)
+            self.draw()
+    def set_tiles(self, event, tiles):
+        """
+        Set a lot of tiles at once (opening a region of zeroes, showing the
+        mines at the end of a game): tiles is an iterable of (index,
+        TileState). Draws once and fires on_set_tiles once, with the indexes
+        of the tiles that changed, rather than once per tile.
+        """
+        changed = self.displaycanvas.set_tiles(tiles)
+        if changed:
+            self.on_set_tiles(event, changed)
+            self.draw()
+    def set_board(self, event, board):
+        """
+        Set every tile: board is a list of rows of TileStates, like
+        get_board returns. Only the tiles that differ from what's shown are
+        changed, drawn and in the on_set_tiles event.
+        """
+        changed = self.displaycanvas.set_board(board)
+        if changed:
+            self.on_set_tiles(event, changed)
+            self.draw()
+
+    def draw(self):
+        """
+        Draw whatever has changed. With deferred dispatch, this only happens
+        once per drain of the run queue no matter how many tiles changed.
+        """
+        if self.pysweep.deferred_dispatch:
+            self.pysweep.runqueue.call_once(self.displaycanvas.draw)
+        else:
             self.displaycanvas.draw()
 
     def get_lcounter(self):
@@ -73,6 +128,8 @@ class GameDisplay(mod.Mod):
         return self.displaycanvas.get_rcounter()
     def get_tile(self, index):
         return self.displaycanvas.get_tile(index)
+    def get_board(self):
+        return self.displaycanvas.get_board()
 
     @mod.trigger
     def on_set_lcounter(self, event, value):
@@ -86,8 +143,72 @@ class GameDisplay(mod.Mod):
     @mod.trigger
     def on_set_tile(self, event, index, tile):
         return event, DisplayEvent('tile', index, tile)
+    @mod.trigger
+    def on_set_tiles(self, event, indexes):
+        return event, DisplayEvent('tiles', indexes)
+
+def area(box):
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+def union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+def add_damage(rects, box, limit):
+    """
+    Add box (x0, y0, x1, y1) to the list of damaged rectangles rects.
 
-class DisplayCanvas(tkinter.Canvas):
+    Rectangles are merged when their bounding box is no bigger than the two
+    of them (neighbouring tiles in a row or column, or one inside the other),
+    so a run of changed tiles becomes one rectangle. Past limit rectangles,
+    box is merged with whichever one grows the least from it instead.
+    """
+    while True:
+        for i, other in enumerate(rects):
+            merged = union(box, other)
+            if area(merged) <= area(box) + area(other):
+                del rects[i]
+                box = merged
+                break
+        else:
+            if len(rects) < limit:
+                rects.append(box)
+                return
+            i = min(range(len(rects)), key=lambda i: area(union(box, rects[i])) - area(rects[i]))
+            box = union(box, rects.pop(i))
+
+def merge_damage(boxes, limit):
+    """
+    Returns at most limit rectangles covering the damaged boxes.
+
+    A lot of boxes that cover most of the area around them (a redraw of the
+    whole board, say) just become that area, without going through
+    add_damage one at a time.
+    """
+    if len(boxes) > 4 * limit:
+        bounds = (
+            min(box[0] for box in boxes),
+            min(box[1] for box in boxes),
+            max(box[2] for box in boxes),
+            max(box[3] for box in boxes),
+        )
+        if 2 * sum(area(box) for box in boxes) >= area(bounds):
+            return [bounds]
+    rects = []
+    for box in boxes:
+        add_damage(rects, box, limit)
+    return rects
+
+class DisplayBuffer:
+    """
+    Everything DisplayCanvas does except putting it on the screen: the tree of
+    parts, drawing into an image (self.img) the size of the display.
+
+    Every time something is pasted, the rectangle it covered is added to
+    self.damage and update is called. The damaged rectangles are merged and
+    presented (actually_update) in one go the next time the master's event
+    loop comes around. self.frames counts how many times that happened, and
+    self.presented how many pixels the last one presented.
+    """
     def __init__(self, master, boardsize, lcounterlength, rcounterlength, images):
         self.master = master
         self.boardsize = boardsize
@@ -96,20 +217,18 @@ class DisplayCanvas(tkinter.Canvas):
         self.images = images
         self.size = self.images.getsize(boardsize, lcounterlength, rcounterlength)
 
-        super().__init__(master, width=self.size[0], height=self.size[1], highlightthickness=0)
-
         self.update_queued = False
+        self.frames = 0
+
+        self.damage = [] # (x0, y0, x1, y1) to present next frame, see merge_damage
+        self.max_damage = 16
+        self.presented = 0 # Pixels presented by the last frame
+        self.presented_total = 0
 
         self.img = Image.new(size=self.size, mode="RGBA", color='green')
-        self.tkimg = ImageTk.PhotoImage(self.img)
-        self.create_image(0, 0, image=self.tkimg, anchor='nw')
 
         self.display = Display.new(self, (0, 0), images, boardsize, lcounterlength, rcounterlength)
 
-        self.draw()
-        # self.img.paste(Image.new(size=self.size, mode="RGBA", color='blue'))
-        # self.draw()
-
     def set_lcounter(self, value):
         return self.display.set_lcounter(value)
     def set_face(self, face):
@@ -118,6 +237,10 @@ class DisplayCanvas(tkinter.Canvas):
         return self.display.set_rcounter(value)
     def set_tile(self, index, tile):
         return self.display.set_tile(index, tile)
+    def set_tiles(self, tiles):
+        return self.display.set_tiles(tiles)
+    def set_board(self, board):
+        return self.display.set_board(board)
 
     def get_lcounter(self):
         return self.display.get_lcounter()
@@ -127,12 +250,34 @@ class DisplayCanvas(tkinter.Canvas):
         return self.display.get_rcounter()
     def get_tile(self, index):
         return self.display.get_tile(index)
+    def get_board(self):
+        return self.display.get_board()
 
     def paste(self, img, pos):
         self.img.paste(img, pos, img)
-        self.update()
+        self.damaged((pos[0], pos[1], pos[0] + img.size[0], pos[1] + img.size[1]))
     def paste_pixel(self, col, pos):
         self.img.paste(col, pos)
+        self.damaged(pos)
+    def paste_opaque(self, img, pos):
+        """
+        paste for images without transparency, which don't need blending.
+        """
+        self.img.paste(img, pos)
+        self.damaged((pos[0], pos[1], pos[0] + img.size[0], pos[1] + img.size[1]))
+
+    def damaged(self, box):
+        """
+        Present box (x0, y0, x1, y1) of self.img next frame.
+        """
+        box = (
+            max(box[0], 0),
+            max(box[1], 0),
+            min(box[2], self.size[0]),
+            min(box[3], self.size[1]),
+        )
+        if box[0] < box[2] and box[1] < box[3]:
+            self.damage.append(box)
         self.update()
 
     def draw(self, force=False):
@@ -159,7 +304,82 @@ class DisplayCanvas(tkinter.Canvas):
 
     def actually_update(self):
         self.update_queued = False
-        self.tkimg.paste(self.img)
+        self.frames += 1
+        rects = merge_damage(self.damage, self.max_damage)
+        self.damage = []
+        self.presented = sum(area(box) for box in rects)
+        self.presented_total += self.presented
+        self.present(rects)
+
+    def present(self, rects):
+        """
+        Show the rectangles rects of self.img. There's nowhere to show them
+        here.
+        """
+        pass
+
+class DisplayCanvas(DisplayBuffer, tkinter.Canvas):
+    """
+    Shows a DisplayBuffer on a Tk canvas.
+    """
+    def __init__(self, master, boardsize, lcounterlength, rcounterlength, images):
+        size = images.getsize(boardsize, lcounterlength, rcounterlength)
+        tkinter.Canvas.__init__(self, master, width=size[0], height=size[1], highlightthickness=0)
+        DisplayBuffer.__init__(self, master, boardsize, lcounterlength, rcounterlength, images)
+
+        self.tkimg = ImageTk.PhotoImage(self.img)
+        self.create_image(0, 0, image=self.tkimg, anchor='nw')
+
+        self.draw()
+        # self.img.paste(Image.new(size=self.size, mode="RGBA", color='blue'))
+        # self.draw()
+
+    def present(self, rects):
+        """
+        Copy just the damaged rectangles to the PhotoImage, through a
+        PhotoImage of each one, since ImageTk.PhotoImage.paste can only paste
+        a whole image at the top left.
+        """
+        for box in rects:
+            if box == (0, 0) + self.size:
+                self.tkimg.paste(self.img)
+                continue
+            region = ImageTk.PhotoImage(self.img.crop(box), master=self)
+            self.tk.call(str(self.tkimg), 'copy', str(region), '-to', box[0], box[1], '-compositingrule', 'set')
+
+class OffscreenCanvas(DisplayBuffer):
+    """
+    A DisplayBuffer that isn't shown anywhere, for running with a
+    pysweep.headless.HeadlessMaster. It has the few tkinter.Canvas methods
+    other mods use, as if it sat at the top left of the screen.
+    """
+    def __init__(self, master, boardsize, lcounterlength, rcounterlength, images):
+        DisplayBuffer.__init__(self, master, boardsize, lcounterlength, rcounterlength, images)
+        self.draw()
+
+    def pack(self, **kwargs):
+        pass
+
+    def update_idletasks(self):
+        pass
+
+    def winfo_rootx(self):
+        return 0
+
+    def winfo_rooty(self):
+        return 0
+
+    def winfo_width(self):
+        return self.size[0]
+
+    def winfo_height(self):
+        return self.size[1]
+
+    def save(self, path):
+        """
+        Write what's been drawn to an image file.
+        """
+        self.img.save(path)
 
 class Part:
     """
@@ -225,6 +445,77 @@ class Part:
         # lowest level already
         return self
 
+class HitIndex:
+    """
+    Where every part of a Display is, so the part under the mouse can be
+    found in constant time instead of searching the tree of parts.
+
+    The edges of all the parts cut the display into a grid of cells, and
+    Part.get_part_containing has the same answer everywhere in a cell, so it
+    is worked out once per cell when the index is built. For each column and
+    row of pixels, the index keeps which column and row of cells it's in, so
+    a lookup is three list indexes. Board tiles aren't parts: which one was
+    hit is worked out from the position by the part holding them (see
+    BoardTiles.get_tile_containing).
+
+    Built by Display when it lays out its parts. If parts are moved (or
+    ignore is changed) afterwards, call Display.index_parts again.
+    """
+    def __init__(self, part):
+        self.position = part.position
+        self.size = part.size
+        left, top = self.position
+        width, height = self.size
+
+        xs = {0}
+        ys = {0}
+        for child in self.walk(part):
+            for x in (child.position[0] - left, child.position[0] - left + child.size[0]):
+                if 0 < x < width:
+                    xs.add(x)
+            for y in (child.position[1] - top, child.position[1] - top + child.size[1]):
+                if 0 < y < height:
+                    ys.add(y)
+        xs = sorted(xs)
+        ys = sorted(ys)
+
+        self.columns = self.bands(xs, width)
+        self.rows = self.bands(ys, height)
+        self.cells = [[Part.get_part_containing(part, (left + x, top + y)) for x in xs] for y in ys]
+
+    @staticmethod
+    def walk(part):
+        yield part
+        for child in part.children.values():
+            yield from HitIndex.walk(child)
+
+    @staticmethod
+    def bands(edges, length):
+        """
+        For every pixel from 0 to length, the number of the band between
+        edges (sorted, starting with 0) it's in.
+        """
+        bands = []
+        for band, (start, end) in enumerate(zip(edges, edges[1:] + [length])):
+            bands.extend([band] * (end - start))
+        return bands
+
+    def hit_test(self, coord):
+        """
+        Returns the lowest Part containing coord, and if that's the board
+        tiles, the index (row, column) of the tile, otherwise None. Returns
+        (None, None) if coord isn't on the display.
+        """
+        x = coord[0] - self.position[0]
+        y = coord[1] - self.position[1]
+        if not (0 <= x < self.size[0] and 0 <= y < self.size[1]):
+            return None, None
+        part = self.cells[self.rows[y]][self.columns[x]]
+        get_tile_containing = getattr(part, 'get_tile_containing', None)
+        if get_tile_containing is None:
+            return part, None
+        return part, get_tile_containing(coord)
+
 class Drawable(Part):
     """
     Parent class for all parts that actually do drawing as opposed to internal
@@ -411,6 +702,58 @@ class Display(Part):
         self.children['panel'] = panel
         self.children['board'] = board
 
+        self.index_parts()
+
+    def index_parts(self):
+        """
+        Build the HitIndex of the parts. Display does this once it's laid
+        out, only call it again if the layout changes.
+        """
+        self.hitindex = HitIndex(self)
+
+    def get_part_containing(self, coord):
+        """
+        Same as Part.get_part_containing, but looked up in the HitIndex.
+        """
+        part, index = self.hitindex.hit_test(coord)
+        if part is None:
+            return self
+        return part
+
+    def hit_test(self, coord):
+        """
+        Returns the lowest Part containing coord, and the index (row, column)
+        of the tile at coord if it's on the board tiles, otherwise None.
+        Both are None if coord isn't on the display.
+        """
+        return self.hitindex.hit_test(coord)
+
+    # The set_ methods return True (or the indexes of the tiles) if anything
+    # changed, so the caller knows whether to draw.
+    def set_lcounter(self, value):
+        return self.children['panel'].children['lcounter'].set_value(value)
+    def set_face(self, face):
+        return self.children['panel'].children['face'].set_face(face)
+    def set_rcounter(self, value):
+        return self.children['panel'].children['rcounter'].set_value(value)
+    def set_tile(self, index, tile):
+        return self.children['board'].children['tiles'].set_tile(index, tile)
+    def set_tiles(self, tiles):
+        return self.children['board'].children['tiles'].set_tiles(tiles)
+    def set_board(self, board):
+        return self.children['board'].children['tiles'].set_board(board)
+
+    def get_lcounter(self):
+        return self.children['panel'].children['lcounter'].get_value()
+    def get_face(self):
+        return self.children['panel'].children['face'].get_face()
+    def get_rcounter(self):
+        return self.children['panel'].children['rcounter'].get_value()
+    def get_tile(self, index):
+        return self.children['board'].children['tiles'].get_tile(index)
+    def get_board(self):
+        return self.children['board'].children['tiles'].get_board()
+
 class Panel(Part):
     def __init__(self, displaycanvas, position, size, images, lcounterlength, rcounterlength):
         Part.__init__(self, displaycanvas, position, size)
@@ -515,7 +858,7 @@ class Board(Part):
 
         bg = GridTile(self.displaycanvas, bgpos, bgsize, self.images.bg)
         border = Border(self.displaycanvas, borderpos, bordersize, self.images.border)
-        tiles = BoardTiles(self.displaycanvas, boardpos, insize, self.images.tile, self.boardsize)
+        tiles = self.tiles_class(self.images.tile)(self.displaycanvas, boardpos, insize, self.images.tile, self.boardsize)
 
         bg.ignore = True
         self.children['bg'] = bg
@@ -523,6 +866,16 @@ class Board(Part):
             self.children[k] = v
         self.children['tiles'] = tiles
 
+    @staticmethod
+    def tiles_class(tileimages):
+        """
+        The class that draws the tiles: CompositedBoardTiles if the
+        compositor can draw tileimages, otherwise BoardTiles.
+        """
+        if gamedisplay.compositor.usable(tileimages):
+            return CompositedBoardTiles
+        return BoardTiles
+
 class Counter(Part):
     @classmethod
     def new(cls, displaycanvas, position, images, counterlength):
@@ -559,6 +912,7 @@ class Counter(Part):
         self.tileschanged = set()
 
     def set_value(self, value):
+        self.value = value
         counterstr = ("{:>"+str(self.counterlength)+"}").format(value)
         if len(counterstr) > len(self.digits):
             if value > 0:
@@ -572,7 +926,7 @@ class Counter(Part):
         return ret
 
     def get_value(self):
-        return counterstr
+        return self.value
 
 
 class Digit(Drawable):
@@ -630,64 +984,170 @@ class Face(Drawable):
             return True
         return False
 
-    def get_face(self, face):
+    def get_face(self):
         return self.face
 
     def _draw(self):
         self.displaycanvas.paste(self.images.i[self.mapping[self.face]], self.position)
 
 class BoardTiles(Part):
+    """
+    The tiles of the board, drawn one paste per tile. There's no object per
+    tile: the state of each one is kept as a byte (its code in TILE_STATES)
+    in a bytearray of the board row by row, the tile images come from one
+    table of codes for the whole board, and where a tile goes on the display
+    is worked out from its index.
+    """
     def __init__(self, displaycanvas, position, size, images, boardsize):
         Part.__init__(self, displaycanvas, position, size)
         self.images = images
         self.boardsize = boardsize
 
-        self.tiles = [[None for i in range(self.boardsize[0])] for i in range(self.boardsize[1])]
-        for col in range(self.boardsize[0]):
-            for row in range(self.boardsize[1]):
-                pos = (
-                    self.position[0] + col * self.images.size[0],
-                    self.position[1] + row * self.images.size[1],
-                )
-                self.tiles[row][col] = Tile.new(self.displaycanvas, pos, self.images)
+        # Tile image by code
+        self.sprites = [self.images.i[TILE_IMAGES[state]] for state in TILE_STATES]
+        self.codes = bytearray([TILE_CODES[TileState.Unopened]]) * (self.boardsize[0] * self.boardsize[1])
 
-        self.tileschanged = set((row, col) for col in range(self.boardsize[0]) for row in range(self.boardsize[1]))
+        self.alldirty = True # Draw everything next time
+        self.tileschanged = set()
 
-        # Don't add tiles to children, so if Part.get_part_containing(self, coord)
-        # is called, the search stops here and BoardTiles is returned, as opposed
-        # to searching within our tiles array and seeing which tile got clicked,
+        # Tiles aren't parts, so if Part.get_part_containing(self, coord) is
+        # called, the search stops here and BoardTiles is returned, as opposed
+        # to searching within our tiles and seeing which tile got clicked,
         # which would only be more annoying to figure out.
 
-    def draw(self, force=False):
-        for row, col in self.tileschanged:
-            self.tiles[row][col].draw(force)
-        self.tileschanged = set()
+    def offset(self, index):
+        """
+        Where the tile at index (row, column) is in self.codes.
+        """
+        row, col = index
+        if not (0 <= row < self.boardsize[1] and 0 <= col < self.boardsize[0]):
+            raise IndexError('Tile {} is not on a {}x{} board'.format(index, *self.boardsize))
+        return row * self.boardsize[0] + col
 
-class Tile(Drawable):
-    @classmethod
-    def new(cls, displaycanvas, position, images):
-        size = images.size
-        return cls(displaycanvas, position, size, images)
+    def get_tile_containing(self, coord):
+        """
+        The index (row, column) of the tile at coord, which should be in
+        this part.
+        """
+        return (
+            (coord[1] - self.position[1]) // self.images.size[1],
+            (coord[0] - self.position[0]) // self.images.size[0],
+        )
 
-    def __init__(self, displaycanvas, position, size, images):
-        Drawable.__init__(self, displaycanvas, position, size)
-        self.images = images
+    def set_tile(self, index, tile):
+        """
+        Set the tile at index (row, column) to a TileState. Returns True if
+        that changed it.
+        """
+        offset = self.offset(index)
+        code = TILE_CODES[tile]
+        if self.codes[offset] == code:
+            return False
+        self.codes[offset] = code
+        self.tileschanged.add(index)
+        return True
 
-        self.state = TileState.Unopened
+    def get_tile(self, index):
+        return TILE_STATES[self.codes[self.offset(index)]]
 
-        self.mapping = {
-            TileState.Mine:      'mine',
-            TileState.Blast:     'blast',
-            TileState.Flag:      'flag',
-            TileState.FlagWrong: 'flag_wrong',
-            TileState.Unopened:  'unopened',
-        }
-        for i in range(9):
-            self.mapping[TileState.Number[i]] = i
+    def set_tiles(self, tiles):
+        """
+        set_tile for every (index, TileState) in tiles. Returns the indexes
+        of the tiles that changed.
+        """
+        return [index for index, tile in tiles if self.set_tile(index, tile)]
 
-    def set_tile(self, tile):
-        self.state = tile
-        self.shoulddraw = True
+    def set_board(self, board):
+        """
+        Set every tile from a list of rows of TileStates. Returns the
+        indexes of the tiles that changed.
+        """
+        columns, rows = self.boardsize
+        if len(board) != rows or any(len(row) != columns for row in board):
+            raise ValueError('Board should be {1} rows of {0} tiles'.format(*self.boardsize))
+        codes = TILE_CODES
+        new = bytearray([codes[state] for row in board for state in row])
+        if new == self.codes:
+            return []
+        changed = [divmod(offset, columns) for offset, (old, code) in enumerate(zip(self.codes, new)) if old != code]
+        self.codes[:] = new # In place, CompositedBoardTiles has a view of it
+        if 2 * len(changed) >= len(new):
+            self.alldirty = True
+        else:
+            self.tileschanged.update(changed)
+        return changed
 
-    def _draw(self):
-        self.displaycanvas.paste(self.images.i[self.mapping[self.state]], self.position)
+    def get_board(self):
+        columns, rows = self.boardsize
+        states = TILE_STATES
+        return [[states[code] for code in self.codes[row * columns:(row + 1) * columns]] for row in range(rows)]
+
+    def draw(self, force=False):
+        columns, rows = self.boardsize
+        if force or self.alldirty:
+            indexes = ((row, col) for row in range(rows) for col in range(columns))
+        else:
+            indexes = self.tileschanged
+        width, height = self.images.size
+        left, top = self.position
+        codes = self.codes
+        sprites = self.sprites
+        paste = self.displaycanvas.paste
+        for row, col in indexes:
+            paste(sprites[codes[row * columns + col]], (left + col * width, top + row * height))
+        self.alldirty = False
+        self.tileschanged = set()
+
+class CompositedBoardTiles(BoardTiles):
+    """
+    BoardTiles drawn by a gamedisplay.compositor.BoardCompositor: changed
+    tiles are drawn in a few array operations on a NumPy view of self.codes
+    and pasted onto the display as one image, rather than one paste per tile.
+    Board uses this instead of BoardTiles when NumPy is installed and the
+    tile images are opaque.
+    """
+    def __init__(self, displaycanvas, position, size, images, boardsize):
+        BoardTiles.__init__(self, displaycanvas, position, size, images, boardsize)
+        self.compositor = gamedisplay.compositor.BoardCompositor(self.sprites, images.size, boardsize, self.codes)
+
+    def changed_boxes(self):
+        """
+        Returns the boxes of tiles (first row, first column, last row + 1,
+        last column + 1) to draw: the whole board if at least half of it
+        changed, otherwise the box around every changed tile, or if most
+        tiles in there didn't change, one for each run of changed tiles in a
+        row.
+        """
+        columns, rows = self.boardsize
+        if self.alldirty or 2 * len(self.tileschanged) >= columns * rows:
+            return [(0, 0, rows, columns)]
+        rows, cols = zip(*self.tileschanged)
+        box = (min(rows), min(cols), max(rows) + 1, max(cols) + 1)
+        if 2 * len(self.tileschanged) >= (box[2] - box[0]) * (box[3] - box[1]):
+            return [box]
+        boxes = []
+        for row, col in sorted(self.tileschanged):
+            if boxes and boxes[-1][0] == row and boxes[-1][3] == col:
+                boxes[-1] = (row, boxes[-1][1], row + 1, col + 1)
+            else:
+                boxes.append((row, col, row + 1, col + 1))
+        return boxes
+
+    def draw(self, force=False):
+        if force:
+            self.alldirty = True
+        if not self.alldirty and not self.tileschanged:
+            return
+        for box in self.changed_boxes():
+            pos = (
+                self.position[0] + box[1] * self.images.size[0],
+                self.position[1] + box[0] * self.images.size[1],
+            )
+            if box[2] - box[0] == 1 and box[3] - box[1] == 1:
+                # A tile on its own is quicker to paste straight from the skin
+                code = self.codes[box[0] * self.boardsize[0] + box[1]]
+                self.displaycanvas.paste_opaque(self.sprites[code], pos)
+            else:
+                self.displaycanvas.paste_opaque(self.compositor.render(box), pos)
+        self.alldirty = False
+        self.tileschanged = set()
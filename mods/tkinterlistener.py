@@ -1,11 +1,14 @@
 import pysweep.time as ptime
 
 import pysweep.mod as mod
-from pysweep.event import Event, EventNode
+from pysweep.event import SlottedEvent, EventNode, EventPool, release
+from pysweep.inputlog import InputRecorder
+
+class TkinterEvent(SlottedEvent):
+    __slots__ = ('eventtype', 'eventname', 'event', 'time')
 
-class TkinterEvent(Event):
     def __init__(self, eventtype, eventname, event):
-        Event.__init__(self)
+        SlottedEvent.__init__(self)
         self.eventtype = eventtype
         self.eventname = eventname
         self.event = event
@@ -18,15 +21,50 @@ class TkinterEvent(Event):
         return str(self)
 
 class TkinterListener(mod.Mod):
+    MOTION = ('event', '<Motion>')
+
     def __init__(self):
         self.triggers = {}
+        self.bound = {} # Listeners of each trigger, wrapped by PySweep's instruments
+
+        # Set to True to recycle TkinterEvents through an EventPool once they
+        # have been dispatched and nothing holds them any more, instead of
+        # allocating one per Tk event.
+        self.pool_events = False
+        self.new_event = TkinterEvent
+
+        # Set by start_recording to log every Tk event we get.
+        self.recorder = None
+
+        # Set to True to collapse bursts of <Motion> events into the latest one
+        # per Tk idle cycle. Every other event first delivers the pending
+        # motion, so the order of button/key transitions and motion is kept.
+        self.coalesce_motion = False
+        self.pending_motion = None
+        self.motion_flush_queued = False
+        self.motion_received = 0
+        self.motion_merged = 0
 
-    def pysweep_register(self, trigger, func):
+    def pysweep_init(self, pysweep):
+        mod.Mod.pysweep_init(self, pysweep)
+        if self.pool_events:
+            self.eventpool = EventPool(TkinterEvent)
+            self.new_event = self.eventpool.new
+
+    def pysweep_listeners_init(self):
+        mod.Mod.pysweep_listeners_init(self)
+        if self.pysweep.memory is not None:
+            self.pysweep_register('<F12>', self.report_memory)
+
+    def pysweep_register(self, trigger, func, deferred=None, where=None):
         """
         Called by other mods to register a callback with a trigger.
 
         We overload it here because tkinter has many events and it'd be stupid
         to create a new function every time we needed one :)
+
+        Tk events always start a chain, so they are only deferred if the
+        listener explicitly asks for it, whatever PySweep's dispatch mode.
         """
         if type(trigger) != tuple:
             trigger = ('event', trigger)
@@ -34,14 +72,130 @@ class TkinterListener(mod.Mod):
         if trigger not in self.triggers:
             self.pysweep.master.bind(eventname, lambda event,trigger=trigger: self.handle_event(trigger, event))
             self.triggers[trigger] = []
+        if deferred:
+            func = self.pysweep.runqueue.deferred(func)
+        if where:
+            func = mod.filtered(func, where)
         self.triggers[trigger].append(func)
+        self.bound.pop(trigger, None)
+
+    def pysweep_unregister(self, trigger, func):
+        """
+        Undoes pysweep_register. The Tk binding stays, it's cheap to have
+        around with nobody listening.
+        """
+        if type(trigger) != tuple:
+            trigger = ('event', trigger)
+        registered = self.triggers.get(trigger, [])
+        registered[:] = [listener for listener in registered if mod.registered_func(listener) != func]
+        self.bound.pop(trigger, None)
+
+    def pysweep_triggers_invalidate(self):
+        self.bound = {}
+
+    def pysweep_unload(self):
+        """
+        Tk would keep calling us after a reload otherwise, and the new
+        instance only binds the events somebody registers with it.
+        """
+        for eventtype, eventname in self.triggers:
+            self.pysweep.master.unbind(eventname)
+        self.triggers = {}
+        self.bound = {}
+        if self.pending_motion is not None:
+            release(self.pending_motion)
+            self.pending_motion = None
+        self.stop_recording()
+
+    def start_recording(self, path):
+        """
+        Append every Tk event we receive from now on to the input log at path
+        (see pysweep.inputlog).
+        """
+        self.stop_recording()
+        self.recorder = InputRecorder(path)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
 
     def handle_event(self, trigger, event):
-        event = TkinterEvent(trigger[0], trigger[1], event)
-        eventnode = EventNode(type(self).__name__, trigger, None, event)
+        if self.recorder is not None:
+            self.recorder.record(trigger, event)
+        event = self.new_event(trigger[0], trigger[1], event)
+        if self.coalesce_motion:
+            if trigger == self.MOTION:
+                self.motion_received += 1
+                if self.pending_motion is not None:
+                    self.motion_merged += 1
+                    release(self.pending_motion)
+                self.pending_motion = event
+                if not self.motion_flush_queued:
+                    self.motion_flush_queued = True
+                    self.pysweep.master.after_idle(self.idle_flush_motion)
+                return
+            self.flush_motion()
+        self.dispatch(trigger, event)
+
+    def idle_flush_motion(self):
+        # Only cleared here: flush_motion is also called straight from
+        # handle_event while this is still queued.
+        self.motion_flush_queued = False
+        self.flush_motion()
+
+    def flush_motion(self):
+        """
+        Deliver the latest coalesced <Motion> event, if there is one.
+        """
+        event = self.pending_motion
+        if event is not None:
+            self.pending_motion = None
+            self.dispatch(self.MOTION, event)
+
+    def dispatch(self, trigger, event):
+        """
+        Call the listeners of trigger with event, then release it (see
+        pysweep.event.EventPool).
+        """
+        eventnode = self.pysweep.journal.record(EventNode(type(self).__name__, trigger, None, event))
         event.pysweep_node = eventnode
-        for listener in self.triggers[trigger]:
-            listener(event)
+        try:
+            listeners = self.bound[trigger]
+        except KeyError:
+            instruments = tuple(self.pysweep.instruments)
+            listeners = self.bound[trigger] = tuple(
+                mod.bind_listener(l, type(self).__name__, trigger[1], instruments)
+                for l in self.triggers[trigger])
+        try:
+            for listener in listeners:
+                listener(event)
+        finally:
+            # release(event), without the call for events that aren't pooled
+            pool = event.pysweep_pool
+            if pool is not None:
+                pool.release(event)
+
+    def coalesce_stats(self):
+        """
+        Returns how many <Motion> events were received, delivered and merged
+        away while coalescing was on, counted from when this listener was
+        created.
+        """
+        pending = 0 if self.pending_motion is None else 1
+        return {
+            'received': self.motion_received,
+            'delivered': self.motion_received - self.motion_merged - pending,
+            'merged': self.motion_merged,
+        }
+
+    def report_memory(self, event):
+        """
+        Print how much memory each mod is holding (see PySweep.memory_report).
+        Bound to F12 only when PySweep accounts memory (main.py --memory),
+        since the first report turns tracing on for the rest of the session.
+        """
+        self.pysweep.memory_report()
 
     # @mod.listen('TkinterListener', '<F2>')
     # def wowlistener(self, event):
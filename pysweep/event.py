@@ -1,7 +1,32 @@
+import weakref
+
 class Event:
+    """
+    Base class for events. It has no __slots__ of its own, so subclasses that
+    don't set __slots__ get a __dict__ as usual, and SlottedEvent can be an
+    Event without one.
+    """
+    __slots__ = ()
+
+    pysweep_pool = None # Only SlottedEvents can come from an EventPool
+
     def __init__(self):
         self.pysweep_node = None
 
+class SlottedEvent(Event):
+    """
+    An event without a per instance __dict__, for events that are created for
+    every bit of input. Subclasses have to list their attributes in __slots__
+    as well.
+
+    pysweep_pool is the EventPool it came from, if any.
+    """
+    __slots__ = ('pysweep_node', 'pysweep_pool')
+
+    def __init__(self):
+        self.pysweep_node = None
+        self.pysweep_pool = None
+
 class DictEvent(dict, Event):
     """
     A event object that acts like a dict. It's probably easiest to use this
@@ -13,22 +38,117 @@ class DictEvent(dict, Event):
 
 class EventNode:
     """
-    Supposed to be some parent class or something. "saa..."
+    Records which mod's trigger created an event and which event caused it.
+
+    Nodes only hold a weak reference to their parent and don't know their
+    children, so they don't keep each other alive. The Journal is what keeps
+    the most recent ones around; use Journal.chain and Journal.children to
+    walk the causality that's still retained.
     """
+    __slots__ = ('modname', 'name', '_parent', 'event', 'seq', '__weakref__')
+
     def __init__(self, modname, name, parent, event):
         self.modname = modname
         self.name = name
-        self.parent = parent
-        self.children = []
+        if parent is None:
+            self._parent = None
+        else:
+            self._parent = weakref.ref(parent)
         self.event = event
+        self.seq = None # Set by Journal.record
+
+    @property
+    def parent(self):
+        """
+        The node of the event that caused this one, or None if there was no
+        such event or it has been forgotten already.
+        """
+        if self._parent is None:
+            return None
+        return self._parent()
 
     def __str__(self):
-        return ("{" + "modname:'{}',name:'{}',event:{},children:{}".format(
+        parent = self.parent
+        return ("{" + "modname:'{}',name:'{}',event:{},parent:{}".format(
             self.modname,
             self.name,
             self.event,
-            self.children
+            None if parent is None else "'{}.{}'".format(parent.modname, parent.name),
         ) + "}")
 
     def __repr__(self):
         return self.__str__()
+
+def hold(event):
+    """
+    Keep a pooled event (see EventPool) from being reused until a matching
+    release. Does nothing for events that aren't pooled.
+    """
+    pool = getattr(event, 'pysweep_pool', None)
+    if pool is not None:
+        pool.hold(event)
+
+def release(event):
+    """
+    Undo a hold (or the hold new gave the event's creator). Does nothing for
+    events that aren't pooled.
+    """
+    pool = getattr(event, 'pysweep_pool', None)
+    if pool is not None:
+        pool.release(event)
+
+class EventPool:
+    """
+    A free list for one SlottedEvent class.
+
+    An event is only reused once everything holding it has released it. new()
+    hands out an event held once, by its creator, which releases it when it's
+    done: a trigger once its listeners have been called (see pysweep.mod),
+    TkinterListener once it has dispatched it. Whatever keeps the event past
+    the call it got it in holds it as well and releases it after: RunQueue for
+    deferred listeners, Clicker.tryup for its after callback. A listener that
+    keeps an event for later has to do the same.
+
+    When the last hold is released, the event goes back on the free list and
+    the next new() reinitialises and returns it. Its EventNode can outlive it
+    in the journal; that node's event is set to None then, so nothing that
+    kept the node sees a different event in its place.
+    """
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.holds = {} # Event handed out: how many times it is held
+        self.allocated = 0
+        self.recycled = 0
+
+    def new(self, *args):
+        if self.free:
+            event = self.free.pop()
+            self.recycled += 1
+        else:
+            event = self.cls.__new__(self.cls)
+            self.allocated += 1
+        event.__init__(*args)
+        event.pysweep_pool = self
+        self.holds[event] = 1
+        return event
+
+    def hold(self, event):
+        if event not in self.holds:
+            raise ValueError("{!r} has been released already".format(event))
+        self.holds[event] += 1
+
+    def release(self, event):
+        try:
+            holds = self.holds[event] - 1
+        except KeyError:
+            raise ValueError("{!r} has been released already".format(event)) from None
+        if holds:
+            self.holds[event] = holds
+            return
+        del self.holds[event]
+        node = event.pysweep_node
+        if node is not None and node.event is event:
+            node.event = None
+        event.pysweep_node = None
+        self.free.append(event)
@@ -0,0 +1,172 @@
+"""
+Running PySweeper without Tk.
+
+HeadlessMaster stands in for the tkinter.Tk root PySweep is normally given.
+It keeps the callbacks mods hand to after, after_idle and bind, and runs them
+when whoever is driving it says so, against a virtual clock. That way the
+whole mod stack runs without an X server (console.py, benchmarks, batch
+jobs), as fast as the CPU allows. GameDisplay draws into an off-screen image
+instead of a canvas when it sees a headless master.
+"""
+
+import collections, heapq, itertools, time
+
+class HeadlessEvent:
+    """
+    Stands in for a tkinter.Event. Attributes that aren't given default to
+    what Tk puts in events that don't have them.
+    """
+    def __init__(self, **kwargs):
+        self.x = 0
+        self.y = 0
+        self.x_root = 0
+        self.y_root = 0
+        self.char = '??'
+        self.keysym = '??'
+        self.num = '??'
+        self.delta = 0
+        self.state = 0
+        self.__dict__.update(kwargs)
+
+class HeadlessMaster:
+    headless = True
+
+    def __init__(self):
+        self.now = 0 # Virtual time in ms
+        self.timers = [] # Heap of (due, seq, id)
+        self.idle = collections.deque() # ids
+        self.events = collections.deque() # (sequence, kwargs) queued with when='tail'
+        self.callbacks = {} # id: (func, args), gone once run or cancelled
+        self.bindings = {} # sequence: list of funcs
+        self.counter = itertools.count()
+        self.running = False
+        self.calls = 0 # How many callbacks have been run
+
+    def after(self, ms, func=None, *args):
+        """
+        Call func(*args) once the clock has moved on ms. Returns an id for
+        after_cancel. Like Tk, after(ms) without func waits: here that
+        moves the clock on.
+        """
+        if func is None:
+            self.advance(ms)
+            return None
+        seq = next(self.counter)
+        id_ = 'after#{}'.format(seq)
+        self.callbacks[id_] = (func, args)
+        heapq.heappush(self.timers, (self.now + max(ms, 0), seq, id_))
+        return id_
+
+    def after_idle(self, func, *args):
+        """
+        Call func(*args) the next time there's nothing else to do.
+        """
+        id_ = 'after#{}'.format(next(self.counter))
+        self.callbacks[id_] = (func, args)
+        self.idle.append(id_)
+        return id_
+
+    def after_cancel(self, id_):
+        self.callbacks.pop(id_, None)
+
+    def bind(self, sequence, func=None, add=None):
+        """
+        Call func(event) for every event_generate(sequence). Replaces what was
+        bound to sequence unless add is true, like Tk.
+        """
+        if func is None:
+            return self.bindings.get(sequence)
+        if add:
+            self.bindings.setdefault(sequence, []).append(func)
+        else:
+            self.bindings[sequence] = [func]
+
+    def unbind(self, sequence, funcid=None):
+        self.bindings.pop(sequence, None)
+
+    def event_generate(self, sequence, when='now', **kwargs):
+        """
+        Call whatever is bound to sequence straight away (like Tk with
+        when='now') with a HeadlessEvent that has the given attributes.
+
+        With when='tail' the event is queued instead and handled on the next
+        update. That is safe to do from other threads, like in Tk.
+        """
+        if when == 'tail':
+            self.events.append((sequence, kwargs))
+            return
+        funcs = self.bindings.get(sequence)
+        if funcs:
+            event = HeadlessEvent(**kwargs)
+            for func in funcs:
+                func(event)
+
+    def _call(self, id_):
+        callback = self.callbacks.pop(id_, None)
+        if callback is not None:
+            func, args = callback
+            self.calls += 1
+            func(*args)
+
+    def update_idletasks(self):
+        """
+        Run idle callbacks until there are none left.
+        """
+        while self.idle:
+            self._call(self.idle.popleft())
+
+    def update(self):
+        """
+        Handle the events queued with when='tail', run every timer that is
+        due, then the idle callbacks. The clock doesn't move.
+        """
+        while self.events:
+            sequence, kwargs = self.events.popleft()
+            self.event_generate(sequence, **kwargs)
+        while self.timers and self.timers[0][0] <= self.now:
+            due, seq, id_ = heapq.heappop(self.timers)
+            self._call(id_)
+        self.update_idletasks()
+
+    def advance(self, ms):
+        """
+        Move the clock on ms, running the timers that come due on the way in
+        order, each at the time it was due.
+        """
+        end = self.now + ms
+        self.update()
+        while self.timers and self.timers[0][0] <= end:
+            self.now = self.timers[0][0]
+            self.update()
+        self.now = end
+
+    def mainloop(self):
+        """
+        Keep the clock in step with real time and run callbacks as they come
+        due until quit is called, like Tk's mainloop. Returns straight away
+        if nothing is scheduled, as nothing could ever happen.
+        """
+        self.running = True
+        start = time.perf_counter() - self.now / 1000
+        while self.running:
+            self.now = (time.perf_counter() - start) * 1000
+            self.update()
+            if self.events:
+                continue
+            if not self.timers:
+                break
+            delay = self.timers[0][0] - (time.perf_counter() - start) * 1000
+            if delay > 0:
+                time.sleep(delay / 1000)
+        self.running = False
+
+    def quit(self):
+        self.running = False
+
+    def destroy(self):
+        self.quit()
+        self.timers = []
+        self.idle.clear()
+        self.events.clear()
+        self.callbacks = {}
+        self.bindings = {}
@@ -0,0 +1,119 @@
+"""
+Lets worker threads hand work back to the Tk thread.
+
+Tk (and so every mod) must only be touched from the thread running the
+mainloop. Worker threads put calls (usually triggers, with their results) in
+an InjectionQueue instead, and the Tk thread runs them a bounded batch at a
+time.
+"""
+
+import queue, threading, time, traceback
+
+from pysweep.profile import Histogram
+
+WAKE_EVENT = '<<PySweepInject>>'
+
+class InjectionQueue:
+    """
+    A thread safe queue of calls that the Tk thread runs at most `batch_size`
+    at a time, coming back for more straight away while there are any, so
+    the display stays responsive.
+
+    Nothing is polled: once the queue is empty the Tk thread stops looking
+    at it, and the next put wakes it up by generating WAKE_EVENT (queued
+    with when='tail', which Tk lets other threads do).
+
+    The queue holds at most `maxsize` calls. When it's full, put blocks the
+    worker thread (or raises queue.Full if it was told not to block), which
+    keeps workers from running away from the Tk thread.
+    """
+    def __init__(self, master, maxsize=1024, batch_size=64):
+        self.master = master
+        self.queue = queue.Queue(maxsize)
+        self.batch_size = batch_size
+        self.running = False
+        self.after_id = None # The tick that is scheduled, if there is one
+
+        # Set by the Tk thread when it found the queue empty and stopped
+        # ticking, cleared by the put that wakes it up.
+        self.lock = threading.Lock()
+        self.sleeping = False
+
+        # Metrics, only touched by the Tk thread
+        self.processed = 0
+        self.max_depth = 0
+        self.wait = Histogram() # ns between put and the call being made
+
+    def put(self, func, *args, block=True, timeout=None):
+        """
+        Queue func(*args) to be called on the Tk thread. Safe to call from
+        any thread.
+        """
+        self.queue.put((time.perf_counter_ns(), func, args), block, timeout)
+        with self.lock:
+            wake = self.sleeping
+            self.sleeping = False
+        if wake:
+            try:
+                self.master.event_generate(WAKE_EVENT, when='tail')
+            except Exception:
+                # Tk refuses events from other threads until its mainloop is
+                # running. Leave the wake up to the next put (or start).
+                with self.lock:
+                    self.sleeping = True
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.master.bind(WAKE_EVENT, self.wake)
+            self.schedule()
+
+    def stop(self):
+        self.running = False
+        if self.after_id is not None:
+            self.master.after_cancel(self.after_id)
+            self.after_id = None
+
+    def schedule(self):
+        self.after_id = self.master.after(0, self.tick)
+
+    def wake(self, event=None):
+        if self.running and self.after_id is None:
+            self.schedule()
+
+    def tick(self):
+        self.after_id = None
+        if not self.running:
+            return
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        for i in range(self.batch_size):
+            try:
+                queued, func, args = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self.wait.record(time.perf_counter_ns() - queued)
+            self.processed += 1
+            try:
+                func(*args)
+            except Exception:
+                traceback.print_exc()
+        with self.lock:
+            # Checked under the lock, so a put either sees sleeping and wakes
+            # us up, or its call is already in the queue here.
+            if self.queue.empty():
+                self.sleeping = True
+                return
+        # Come back straight away for the backlog.
+        self.schedule()
+
+    def stats(self):
+        return {
+            'depth': self.queue.qsize(),
+            'max_depth': self.max_depth,
+            'processed': self.processed,
+            'wait_p50_ns': self.wait.percentile(50),
+            'wait_p99_ns': self.wait.percentile(99),
+            'wait_max_ns': self.wait.max or 0,
+        }
@@ -0,0 +1,155 @@
+"""
+Recording Tk input to a compact binary log, and replaying it.
+
+The log starts with MAGIC, followed by one record per Tk event:
+
+    RECORD header: monotonic time (ns), x, y, x_root, y_root, and the
+                   lengths (2 bytes each) of the three strings that follow
+    event type, event name, char: utf-8, without terminators
+
+Records are appended in batches and read back with mmap.
+"""
+
+import collections, mmap, struct, time
+
+MAGIC = b'PSIL\x02'
+RECORD = struct.Struct('<qiiiiHHH')
+
+Record = collections.namedtuple('Record',
+    ['time', 'eventtype', 'eventname', 'x', 'y', 'x_root', 'y_root', 'char'])
+
+def _int(value):
+    # Tk uses '??' for fields that don't apply to the event.
+    return value if type(value) == int else 0
+
+class InputRecorder:
+    """
+    Appends Tk events to a log file, writing every batch_size events.
+    """
+    def __init__(self, path, batch_size=256):
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer = bytearray()
+        self.pending = 0
+        self.count = 0
+        self.file = open(path, 'a+b')
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        else:
+            # Don't append records to a log in another format
+            self.file.seek(0)
+            magic = self.file.read(len(MAGIC))
+            self.file.seek(0, 2)
+            if magic != MAGIC:
+                self.file.close()
+                raise ValueError("{} is not a PySweeper input log in the current format".format(path))
+
+    def record(self, trigger, event):
+        eventtype = trigger[0].encode()
+        eventname = trigger[1].encode()
+        char = getattr(event, 'char', '')
+        char = (char if type(char) == str else '').encode()
+        self.buffer += RECORD.pack(
+            time.monotonic_ns(),
+            _int(getattr(event, 'x', 0)),
+            _int(getattr(event, 'y', 0)),
+            _int(getattr(event, 'x_root', 0)),
+            _int(getattr(event, 'y_root', 0)),
+            len(eventtype), len(eventname), len(char))
+        self.buffer += eventtype
+        self.buffer += eventname
+        self.buffer += char
+        self.pending += 1
+        self.count += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer = bytearray()
+        self.pending = 0
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+class InputLog:
+    """
+    Reads a log written by InputRecorder. Iterating gives Records in the
+    order they were recorded.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic = f.read(len(MAGIC))
+            if magic[:-1] == MAGIC[:-1] and magic != MAGIC:
+                raise ValueError("{} is an input log in an older format, record it again".format(path))
+            if magic != MAGIC:
+                raise ValueError("{} is not a PySweeper input log".format(path))
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __iter__(self):
+        data = self.map
+        unpack_from = RECORD.unpack_from
+        size = RECORD.size
+        offset = len(MAGIC)
+        end = len(data)
+        while offset + size <= end:
+            t, x, y, x_root, y_root, typelen, namelen, charlen = unpack_from(data, offset)
+            offset += size
+            eventtype = data[offset:offset+typelen].decode()
+            offset += typelen
+            eventname = data[offset:offset+namelen].decode()
+            offset += namelen
+            char = data[offset:offset+charlen].decode()
+            offset += charlen
+            yield Record(t, eventtype, eventname, x, y, x_root, y_root, char)
+
+    def close(self):
+        self.map.close()
+
+class ReplayedEvent:
+    """
+    Stands in for the tkinter.Event a Record was made from.
+    """
+    __slots__ = ('x', 'y', 'x_root', 'y_root', 'char')
+
+    def __init__(self, record):
+        self.x = record.x
+        self.y = record.y
+        self.x_root = record.x_root
+        self.y_root = record.y_root
+        self.char = record.char
+
+def replay(listener, log, realtime=False, pump=None):
+    """
+    Feed every record in log to the TkinterListener listener, through the
+    same handle_event Tk would call.
+
+    If realtime, wait so events are spaced out the way they were recorded,
+    otherwise go as fast as possible. pump, if given, is called after every
+    event to run anything the listeners scheduled (e.g. a Tk root's update or
+    a headless scheduler).
+
+    Events nobody listens to are skipped. Returns how many were replayed.
+    """
+    count = 0
+    start = None
+    for record in log:
+        trigger = (record.eventtype, record.eventname)
+        if trigger not in listener.triggers:
+            continue
+        if realtime:
+            if start is None:
+                start = (record.time, time.monotonic_ns())
+            delay = (record.time - start[0]) - (time.monotonic_ns() - start[1])
+            if delay > 0:
+                time.sleep(delay / 1e9)
+        listener.handle_event(trigger, ReplayedEvent(record))
+        count += 1
+        if pump is not None:
+            pump()
+    return count
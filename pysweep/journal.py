@@ -0,0 +1,78 @@
+"""
+A fixed size record of the most recent EventNodes, so we can tell which
+trigger caused which without keeping every event ever made alive.
+"""
+
+import collections
+
+class Journal:
+    """
+    Ring buffer of EventNodes.
+
+    Every node a trigger creates is recorded here and gets a sequence number.
+    Only the last `capacity` nodes are kept alive by the journal. Older ones
+    are dropped and, since nodes only hold weak references to their parents,
+    freed as soon as nothing else refers to their events.
+    """
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.nodes = collections.deque(maxlen=capacity)
+        self.seq = 0 # Sequence number the next recorded node will get
+
+    def record(self, node):
+        node.seq = self.seq
+        self.seq += 1
+        self.nodes.append(node)
+        return node
+
+    def resize(self, capacity):
+        """
+        Change how many nodes are retained. Shrinking drops the oldest ones.
+        """
+        self.capacity = capacity
+        self.nodes = collections.deque(self.nodes, maxlen=capacity)
+
+    def clear(self):
+        self.nodes.clear()
+
+    def retains(self, node):
+        """
+        Returns True if node is one of the nodes this journal still holds.
+        """
+        first = self.seq - len(self.nodes)
+        return (node.seq is not None and first <= node.seq < self.seq and
+            self.nodes[node.seq - first] is node)
+
+    def get(self, seq):
+        """
+        Returns the node with sequence number seq, or None if it's not retained.
+        """
+        first = self.seq - len(self.nodes)
+        if first <= seq < self.seq:
+            return self.nodes[seq - first]
+        return None
+
+    def chain(self, node):
+        """
+        Yields node, then the node that caused it, and so on, stopping at the
+        root cause or at the first ancestor that is no longer retained.
+        """
+        while node is not None and self.retains(node):
+            yield node
+            node = node.parent
+
+    def children(self, node):
+        """
+        Returns the retained nodes that were directly caused by node, oldest
+        first.
+        """
+        return [child for child in self.nodes if child.parent is node]
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __iter__(self):
+        """
+        Iterates over the retained nodes, oldest first.
+        """
+        return iter(self.nodes)
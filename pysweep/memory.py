@@ -0,0 +1,157 @@
+"""
+Memory accounting per mod, for finding out which mod is holding on to memory
+in a long session.
+
+MemoryAccounting traces allocations with tracemalloc, and charges every block
+that is still allocated to the module of a loaded mod: the first one whose
+source shows up in the traceback of the allocation, most recent frame first.
+Memory the engine allocates on a mod's behalf (event nodes the journal keeps,
+listener wrappers) is charged to the mod that called into it, as long as the
+traceback is deep enough to reach it (see frames). Whatever isn't charged to
+a mod is charged to 'pysweep' if it was allocated in the engine, or '(other)'.
+
+Each report compares with the one before it, so leaks show up as growth.
+
+PySweep.memory_report is the way in. When PySweep accounts memory from the
+start (account_memory, main.py --memory), TkinterListener calls it when F12 is
+pressed, which works with a pysweep.headless.HeadlessMaster too
+(master.event_generate('<F12>')).
+"""
+
+import os
+import sys
+import tracemalloc
+
+import pysweep.modloader
+import pysweep.profile
+import pysweep.startup
+
+FRAMES = 16 # How deep the tracebacks tracemalloc keeps are
+
+PYSWEEP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class MemoryAccounting:
+    def __init__(self, frames=FRAMES):
+        """
+        Starts tracing allocations, so only what is allocated from then on
+        is seen. If tracemalloc was already tracing (with
+        PYSWEEP_PROFILE_STARTUP, for one) it keeps going, with the traceback
+        depth it was started with.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        elif pysweep.startup.profiler is not None:
+            # The startup profiler would stop tracing after its report
+            pysweep.startup.profiler.keep_tracing()
+        self.frames = tracemalloc.get_traceback_limit()
+        self.last = {} # owner: bytes, as of the last report
+        self.reports = 0
+
+    def owners(self, mods):
+        """
+        Returns a dict of the names of the modules the mods (a dict of mod
+        names and mods) came from, and the names of the mods in each, and a
+        function mapping a source file to the module it belongs to, or None.
+        """
+        modules = {}
+        files = {}
+        packages = []
+        for modname, mod in mods.items():
+            name = type(mod).__module__.partition('.')[0]
+            module = sys.modules.get(name)
+            if getattr(module, '__file__', None) is None:
+                continue
+            modules.setdefault(name, []).append(modname)
+            path, type_ = pysweep.modloader.module_location(module)
+            if type_ == pysweep.modloader.PKG_DIRECTORY:
+                packages.append((os.path.join(os.path.abspath(path), ''), name))
+            else:
+                files[os.path.abspath(path)] = name
+
+        cache = {}
+        def owner_of(filename):
+            try:
+                return cache[filename]
+            except KeyError:
+                pass
+            path = os.path.abspath(filename)
+            owner = files.get(path)
+            if owner is None:
+                for prefix, name in packages:
+                    if path.startswith(prefix):
+                        owner = name
+                        break
+            cache[filename] = owner
+            return owner
+
+        return modules, owner_of
+
+    def snapshot(self, mods):
+        """
+        Returns a list of records (owner, its mods, bytes and blocks still
+        allocated, and growth in bytes since the last snapshot), biggest
+        first.
+        """
+        modules, owner_of = self.owners(mods)
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+
+        totals = {}
+        for stat in snapshot.statistics('traceback'):
+            owner = None
+            for frame in reversed(stat.traceback): # Most recent first
+                owner = owner_of(frame.filename)
+                if owner is not None:
+                    break
+            if owner is None:
+                innermost = os.path.abspath(stat.traceback[-1].filename)
+                owner = 'pysweep' if innermost.startswith(os.path.join(PYSWEEP_DIR, '')) else '(other)'
+            size, count = totals.get(owner, (0, 0))
+            totals[owner] = (size + stat.size, count + stat.count)
+
+        records = [{
+            'owner': owner,
+            'mods': modules.get(owner, []),
+            'bytes': size,
+            'blocks': count,
+            'growth': size - self.last.get(owner, 0),
+        } for owner, (size, count) in totals.items()]
+        records.sort(key=lambda record: -record['bytes'])
+        self.last = {owner: size for owner, (size, count) in totals.items()}
+        self.reports += 1
+        return records
+
+    def table(self, records, limit=10):
+        """
+        Returns the first limit records as a text table, followed by the
+        totals of all of them.
+        """
+        rows = [(
+            record['owner'],
+            ', '.join(record['mods']),
+            '{:,.1f}'.format(record['bytes'] / 1024),
+            '{:,}'.format(record['blocks']),
+            '{:+,.1f}'.format(record['growth'] / 1024),
+        ) for record in records[:limit]]
+        rows.append((
+            'total', '',
+            '{:,.1f}'.format(sum(record['bytes'] for record in records) / 1024),
+            '{:,}'.format(sum(record['blocks'] for record in records)),
+            '{:+,.1f}'.format(sum(record['growth'] for record in records) / 1024),
+        ))
+        header = ('module', 'mods', 'KiB', 'blocks', 'growth KiB')
+        return pysweep.profile.text_table(header, rows)
+
+    def report(self, mods, limit=10):
+        """
+        Take a snapshot and print the limit biggest consumers. Returns the
+        records.
+        """
+        first = self.reports == 0
+        records = self.snapshot(mods)
+        print()
+        print("Memory by mod module ({} frames traced, growth since {}):".format(
+            self.frames, 'tracing started' if first else 'the last report'))
+        print(self.table(records, limit))
+        return records
@@ -5,23 +5,36 @@ functions mods will need to use.
 
 import inspect
 import functools
+import itertools
+import operator
 
-from pysweep.event import EventNode
+from pysweep.event import EventNode, release
 
-def listen(mod, trigger):
+def listen(mod, trigger, deferred=None, where=None):
     """
     Decorator for methods that need to be callable by other mods.
+
+    deferred: True to always have the trigger queue the event on the run
+    queue instead of calling the method straight away, False to always be
+    called straight away. None follows PySweep's dispatch mode.
+
+    where: Only call the method for events whose attributes match, e.g.
+    where={'button': Button.L} or where={'action': (Action.D, Action.U)}.
+    Values that are tuples, lists or sets match any of their items.
+    Attributes can be dotted, like where={'event.char': ('1', '2')}. Compiled
+    triggers look the listeners up by attribute value instead of calling
+    them to find out, so the values have to be hashable.
     """
     def decorate(f):
         try:
             f.pysweep_listening_to
         except:
             f.pysweep_listening_to = []
-        f.pysweep_listening_to.append((mod, trigger))
+        f.pysweep_listening_to.append((mod, trigger, {'deferred': deferred, 'where': where}))
         return f
     return decorate
 
-def trigger(f):
+def trigger(f=None, eventnode=True):
     """
     Decorator for methods that need to trigger mods listening to this event.
 
@@ -31,39 +44,312 @@ def trigger(f):
     Any method that does something another mod might be interested in should
     use this decorator and then return an Event to indicate that a thing was
     done.
+
+    Triggers that fire very often (like mouse motion) and whose causality
+    nobody inspects can be declared with @mod.trigger(eventnode=False). No
+    EventNode is built for them: the new event simply carries the node of the
+    event that caused it, and the trigger returns None.
+
+    An event from an EventPool is released once the listeners have been
+    called (see pysweep.event.EventPool), so return a new one every time.
     """
+    if f is None:
+        return lambda f: trigger(f, eventnode)
+
+    name = f.__name__
+
     @functools.wraps(f)
     def _wrap(self, *args, **kwargs):
         rootevent, event = f(self, *args, **kwargs)
-        if rootevent != None:
+        if rootevent is not None:
             rootnode = rootevent.pysweep_node
         else:
             rootnode = None
-        eventnode = EventNode(type(self).__name__, f.__name__, rootnode, event)
-        event.pysweep_node = eventnode
-        if rootnode != None:
-            rootnode.children.append(eventnode)
-        for listener in self.pysweep_triggers[f.__name__]:
-            listener(event)
-        return eventnode
+        if eventnode:
+            node = self.pysweep.journal.record(EventNode(type(self).__name__, name, rootnode, event))
+            event.pysweep_node = node
+        else:
+            node = None
+            event.pysweep_node = rootnode
+        try:
+            for listener in self.pysweep_triggers[name]:
+                listener(event)
+        finally:
+            release(event)
+        return node
     _wrap.pysweep_is_trigger = True
+    _wrap.pysweep_trigger_func = f
+    _wrap.pysweep_eventnode = eventnode
     return _wrap
 
+def _spec_values(spec):
+    if isinstance(spec, (tuple, list, set, frozenset)):
+        return spec
+    return (spec,)
+
+def _matches(spec, value):
+    if isinstance(spec, (tuple, list, set, frozenset)):
+        return value in spec
+    return value == spec
+
+def _attr(event, attr):
+    """
+    getattr(event, attr, None), but attr can be dotted.
+    """
+    for name in attr.split('.'):
+        event = getattr(event, name, None)
+    return event
+
+def filtered(func, where):
+    """
+    Returns a listener that only calls func with events whose attributes
+    match where (see listen).
+    """
+    items = tuple(where.items())
+    def listener(event):
+        for attr, spec in items:
+            if not _matches(spec, _attr(event, attr)):
+                return
+        func(event)
+    listener.pysweep_filtered = func
+    listener.pysweep_where = where
+    return listener
+
+class ListenerIndex:
+    """
+    Works out which listeners of a trigger to call for an event, for triggers
+    where some listeners only want events that match a where (see listen).
+
+    Events are keyed on the values of every attribute any listener filters
+    on. The listeners for every combination of values that appear in the
+    filters are worked out up front; other combinations are worked out the
+    first time they're seen and remembered. Every tuple keeps the order the
+    listeners registered in.
+    """
+    max_size = 4096
+
+    def __init__(self, entries):
+        """
+        entries is a list of (where, listener) pairs, where is None for
+        listeners that want every event.
+        """
+        self.entries = entries
+        self.attrs = sorted({attr for where, listener in entries if where is not None for attr in where})
+        self.key = operator.attrgetter(*self.attrs)
+        self.index = {}
+
+        values = []
+        for attr in self.attrs:
+            attrvalues = set()
+            for where, listener in entries:
+                if where is not None and attr in where:
+                    attrvalues.update(_spec_values(where[attr]))
+            values.append(attrvalues)
+        size = 1
+        for attrvalues in values:
+            size *= len(attrvalues)
+        if size <= self.max_size:
+            for combination in itertools.product(*values):
+                key = combination if len(self.attrs) > 1 else combination[0]
+                self.index[key] = self.match(combination)
+
+    def match(self, values):
+        return tuple(listener for where, listener in self.entries
+            if where is None or all(_matches(where[attr], value)
+                for attr, value in zip(self.attrs, values) if attr in where))
+
+    def select(self, event):
+        """
+        The slow path for events whose key isn't in the index yet.
+        """
+        values = tuple(_attr(event, attr) for attr in self.attrs)
+        key = values if len(self.attrs) > 1 else values[0]
+        selected = self.match(values)
+        try:
+            if len(self.index) < self.max_size:
+                self.index[key] = selected
+        except TypeError:
+            pass # Unhashable, can't be remembered
+        return selected
+
+def bind_listener(listener, modname, trigger, instruments):
+    """
+    Returns what a compiled trigger should call for this listener.
+
+    If the listener is itself a trigger (a method that both listens and
+    triggers), use the compiled version of it so chains of triggers don't
+    fall back to the slow path halfway through. Then let every instrument
+    (see PySweep.add_instrument) wrap it. Filtered and deferred listeners are
+    unwrapped first so that it's the actual call that gets instrumented, not
+    checking the filter or queueing it up.
+    """
+    where = getattr(listener, 'pysweep_where', None)
+    if where is not None:
+        return filtered(bind_listener(listener.pysweep_filtered, modname, trigger, instruments), where)
+    func = getattr(listener, 'pysweep_deferred', None)
+    if func is not None:
+        return listener.pysweep_runqueue.deferred(
+            bind_listener(func, modname, trigger, instruments))
+    func = getattr(listener, '__func__', None)
+    if getattr(func, 'pysweep_is_trigger', False):
+        listener = getattr(listener.__self__, func.__name__)
+    for instrument in instruments:
+        listener = instrument.wrap(modname, trigger, listener)
+    return listener
+
+def compile_trigger(mod, name):
+    """
+    Returns a callable that does the same thing as calling the trigger `name`
+    on `mod`, but without looking anything up in mod.pysweep_triggers.
+
+    The listeners are bound lazily into an immutable tuple the first time the
+    trigger fires (by then every other mod has been compiled as well, so
+    listeners that are triggers themselves resolve to their compiled
+    versions). Registering a new listener or changing PySweep's instruments
+    calls pysweep_invalidate, which makes the next call bind again.
+    """
+    wrap = getattr(type(mod), name)
+    f = wrap.pysweep_trigger_func
+    modname = type(mod).__name__
+    registered = mod.pysweep_triggers[name]
+    pysweep = mod.pysweep
+    journal = pysweep.journal
+    listeners = None
+    # Only used when some listeners filter events, see ListenerIndex
+    index = None
+    key = None
+    select = None
+
+    def bind():
+        nonlocal listeners, index, key, select
+        instruments = tuple(pysweep.instruments)
+        entries = []
+        for listener in registered:
+            where = getattr(listener, 'pysweep_where', None)
+            if where is not None:
+                listener = listener.pysweep_filtered
+            entries.append((where, bind_listener(listener, modname, name, instruments)))
+        listeners = tuple(listener for where, listener in entries)
+        if all(where is None for where, listener in entries):
+            index = key = select = None
+        else:
+            listenerindex = ListenerIndex(entries)
+            index = listenerindex.index
+            key = listenerindex.key
+            select = listenerindex.select
+
+    def invalidate():
+        nonlocal listeners
+        listeners = None
+
+    eventnode = wrap.pysweep_eventnode
+
+    # Same as trigger's _wrap, minus the lookups
+    def _compiled(*args, **kwargs):
+        rootevent, event = f(mod, *args, **kwargs)
+        if rootevent is not None:
+            rootnode = rootevent.pysweep_node
+        else:
+            rootnode = None
+        if eventnode:
+            node = journal.record(EventNode(modname, name, rootnode, event))
+            event.pysweep_node = node
+        else:
+            node = None
+            event.pysweep_node = rootnode
+        if listeners is None:
+            bind()
+        if index is None:
+            selected = listeners
+        else:
+            try:
+                selected = index[key(event)]
+            except (KeyError, AttributeError, TypeError):
+                selected = select(event)
+        try:
+            for listener in selected:
+                listener(event)
+        finally:
+            # release(event), without the call for events that aren't pooled
+            pool = getattr(event, 'pysweep_pool', None)
+            if pool is not None:
+                pool.release(event)
+        return node
+
+    functools.update_wrapper(_compiled, f)
+    _compiled.pysweep_is_trigger = True
+    _compiled.pysweep_invalidate = invalidate
+    return _compiled
+
+def registered_func(listener):
+    """
+    Returns the function that was passed to pysweep_register to get listener.
+    """
+    func = getattr(listener, 'pysweep_filtered', listener)
+    return getattr(func, 'pysweep_deferred', func)
+
+def describe(cl):
+    """
+    Returns what the @trigger and @listen decorators recorded on the methods
+    of the mod class cl, as plain data (see pysweep.modloader.LazyMod):
+
+    {'triggers': [method name, ...],
+     'listens': [[method name, mod, trigger, deferred], ...]}
+    """
+    return {
+        'triggers': list(cl.pysweep_trigger_names),
+        'listens': [[funcname, mod, trigger, options['deferred']]
+            for funcname, mod, trigger, options in cl.pysweep_listeners],
+    }
+
+def functions(cl):
+    """
+    Returns a dict of the names and functions of every method of cl,
+    inherited ones included, without binding or looking anything up on an
+    instance.
+    """
+    members = {}
+    for klass in reversed(cl.__mro__):
+        members.update(vars(klass))
+    return {name: member for name, member in members.items() if inspect.isfunction(member)}
+
+def collect(cl):
+    """
+    Work out what the @trigger and @listen decorators put on the methods of
+    the class cl and cache it on the class, so that instances don't have to
+    go looking. Mod.__init_subclass__ does this for every mod class.
+
+    pysweep_functions: names of every method
+    pysweep_trigger_names: names of the triggers
+    pysweep_listeners: (method name, mod, trigger, options) of every listen
+    """
+    funcs = functions(cl)
+    cl.pysweep_functions = frozenset(funcs)
+    cl.pysweep_trigger_names = tuple(name for name in sorted(funcs)
+        if getattr(funcs[name], 'pysweep_is_trigger', False))
+    cl.pysweep_listeners = tuple((name, mod, trigger, options) for name in sorted(funcs)
+        for mod, trigger, options in getattr(funcs[name], 'pysweep_listening_to', ()))
+
 def ismod(cl):
     """
     Determines if a class is a mod or not by checking it has all the right
     functions. I'm not sure if it'd be better to just test if it's a subclass
     of Mod, but duck typing! \o/
     """
-    modset = {fname for fname, _ in inspect.getmembers(Mod, predicate=inspect.isfunction)}
-    clset = {fname for fname, _ in inspect.getmembers(cl, predicate=inspect.isfunction)}
-    missing = modset - clset
+    clset = cl.__dict__.get('pysweep_functions')
+    if clset is None:
+        clset = functions(cl).keys()
+    missing = Mod.pysweep_functions - clset
     return len(missing) == 0, missing
 
 class Mod:
     """
     Parent class for all mods
     """
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        collect(cls)
+
     def __init__(self):
         """
         Called 1st. No guarantees about any other mods.
@@ -82,28 +368,34 @@ class Mod:
         Called 3rd.
         Set up triggers so other mods can listen to them.
         """
-        self.pysweep_triggers = {}
-        for funcname, func in inspect.getmembers(self, predicate=inspect.ismethod):
-            try:
-                func.pysweep_is_trigger
-            except:
-                continue
-            if func.pysweep_is_trigger:
-                self.pysweep_triggers[func.__name__] = []
+        self.pysweep_triggers = {name: [] for name in self.pysweep_trigger_names}
 
     def pysweep_listeners_init(self):
         """
         Called 4th.
         Listen to the other mods' triggers now that they've been set up.
         """
-        for funcname, func in inspect.getmembers(self, predicate=inspect.ismethod):
-            try:
-                func.pysweep_listening_to
-            except:
-                continue
+        for funcname, mod, trigger, options in self.pysweep_listeners:
+            self.pysweep.mods[mod].pysweep_register(trigger, getattr(self, funcname), **options)
+
+    def pysweep_triggers_compile(self):
+        """
+        Called after pysweep_listeners_init when PySweep runs with compiled
+        triggers (the default).
+        Replace every trigger on this instance with a compiled version.
+        """
+        for trigger in self.pysweep_triggers:
+            setattr(self, trigger, compile_trigger(self, trigger))
 
-            for mod, trigger in func.pysweep_listening_to:
-                self.pysweep.mods[mod].pysweep_register(trigger, func)
+    def pysweep_triggers_invalidate(self):
+        """
+        Make every compiled trigger on this instance bind its listeners again
+        the next time it fires. Called by PySweep when its instruments change.
+        """
+        for trigger in self.pysweep_triggers:
+            invalidate = getattr(getattr(self, trigger), 'pysweep_invalidate', None)
+            if invalidate is not None:
+                invalidate()
 
     def pysweep_before_finish_init(self):
         """
@@ -120,9 +412,23 @@ class Mod:
         """
         pass
 
-    def pysweep_register(self, trigger, func):
+    def pysweep_unload(self):
+        """
+        Called when this instance is being replaced by a reloaded one (see
+        pysweep.reload), after its listeners have been unregistered.
+        Undo anything done outside of PySweep, like creating Tk widgets.
+        """
+        pass
+
+    def pysweep_register(self, trigger, func, deferred=None, where=None):
         """
         Called by other mods to register a callback with a trigger.
+
+        If deferred (or PySweep's dispatch mode when deferred is None), the
+        trigger puts the call on the run queue instead of making it.
+
+        If where is given, func is only called with events that match it
+        (see listen).
         """
         if not hasattr(self, trigger):
             raise ValueError("Trigger {} does not exist".format(trigger))
@@ -132,4 +438,34 @@ class Mod:
         except Exception as e:
             raise ValueError("'{}' is not a trigger".format(trigger)) from e
 
+        if deferred is None:
+            deferred = self.pysweep.deferred_dispatch
+        if deferred:
+            func = self.pysweep.runqueue.deferred(func)
+        if where:
+            func = filtered(func, where)
         self.pysweep_triggers[trigger].append(func)
+        self.pysweep_trigger_changed(trigger)
+
+    def pysweep_unregister(self, trigger, func):
+        """
+        Called by other mods to undo pysweep_register. Every registration of
+        func with trigger is removed.
+        """
+        registered = self.pysweep_triggers[trigger]
+        registered[:] = [listener for listener in registered if registered_func(listener) != func]
+        self.pysweep_trigger_changed(trigger)
+
+    def pysweep_trigger_changed(self, trigger):
+        """
+        Make the compiled version of trigger (if there is one) bind its
+        listeners again.
+        """
+        try:
+            invalidate = getattr(self, trigger).pysweep_invalidate
+        except AttributeError:
+            pass
+        else:
+            invalidate()
+
+collect(Mod)
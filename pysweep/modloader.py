@@ -2,11 +2,20 @@
 Functions that load modules from directories
 """
 
-import os, imp, inspect, traceback
+import os, sys, ast, heapq, importlib.util, json, time, traceback
 
 import pysweep.mod
+import pysweep.startup
 
-def load_mods_in(*paths):
+# Where find_modules remembers what it found, see load_manifest.
+MANIFEST_PATH = '~/.pysweeper/cache/discovery.json'
+MANIFEST_VERSION = 3
+
+# Module types, as found by find_modules
+PY_SOURCE = 'source'
+PKG_DIRECTORY = 'package'
+
+def load_mods_in(*paths, manifest_path=MANIFEST_PATH):
     """
     Load all mods found in the directories pointed to by the paths list.
 
@@ -14,21 +23,247 @@ def load_mods_in(*paths):
 
     Returns a dict where keys are mod names and values are mods
     """
+    manifest = load_manifest(manifest_path)
+    module_path_dict = find_modules_in(paths, set(), manifest)
+
+    print()
+
+    name_module_dict = import_modules(module_path_dict, manifest)
+    save_manifest(manifest_path, manifest)
+
+    name_mod_dict = load_mods(name_module_dict)
+
+    return name_mod_dict
+
+def load_mods_lazily(paths, lazy_paths, manifest_path=MANIFEST_PATH):
+    """
+    Like load_mods_in(*paths, *lazy_paths), except that the mods found in
+    lazy_paths aren't imported, just described by a LazyMod, if the manifest
+    already knows what's in them.
+
+    They're imported anyway if they haven't been seen before (that's how the
+    manifest learns about them), if a mod in them doesn't listen to anything
+    (there would be nothing to wake it up), or if an imported module imports
+    them.
+
+    Returns (name_mod_dict, name_lazymod_dict).
+    """
+    manifest = load_manifest(manifest_path)
+    seen = set()
+    module_path_dict = find_modules_in(paths, seen, manifest)
+    lazy_module_path_dict = find_modules_in(lazy_paths, seen, manifest)
+    for name in lazy_module_path_dict:
+        module_path_dict.pop(name, None)
+
+    print()
+
+    lazy = {}
+    for name, (path, type_) in sorted(lazy_module_path_dict.items()):
+        entry = manifest['modules'].get(path)
+        if (entry is None or entry['stamp'] != module_stamp(path, type_)
+                or not all(description['listens'] for description in entry['mods'].values())):
+            module_path_dict[name] = (path, type_)
+        else:
+            lazy[name] = entry
+
+    all_module_path_dict = dict(module_path_dict)
+    all_module_path_dict.update(lazy_module_path_dict)
+    needed = list(module_path_dict)
+    while needed:
+        name = needed.pop()
+        path, type_ = all_module_path_dict[name]
+        for dependency in find_dependencies(name, path, type_, all_module_path_dict, manifest):
+            if dependency in lazy:
+                del lazy[dependency]
+                module_path_dict[dependency] = all_module_path_dict[dependency]
+                needed.append(dependency)
+
+    name_module_dict = import_modules(module_path_dict, manifest)
+
+    name_mod_dict = load_mods(name_module_dict)
+
+    for name, (module, path) in name_module_dict.items():
+        if name in lazy_module_path_dict:
+            record_module(manifest, name, module, *lazy_module_path_dict[name])
+    save_manifest(manifest_path, manifest)
+
+    name_lazymod_dict = {}
+    for modulename, entry in sorted(lazy.items()):
+        path, type_ = lazy_module_path_dict[modulename]
+        for modname, description in entry['mods'].items():
+            name_mod_dict.pop(modname, None)
+            name_lazymod_dict[modname] = LazyMod(modname, modulename, description, all_module_path_dict)
+    print("Not loading yet: {}".format(list(name_lazymod_dict.keys())))
+    print()
+
+    return name_mod_dict, name_lazymod_dict
+
+def find_modules_in(paths, seen, manifest):
+    """
+    Runs find_modules on every path that is a directory.
+
+    Later elements override earlier elements.
+    """
     module_path_dict = {}
     for path in paths:
         path = os.path.expanduser(path)
         if not os.path.isdir(path): # Just check if it exists and is a directory.
             print("Path {} not found or is not a directory, skipping.".format(path))
             continue
-        module_path_dict.update(find_modules(path))
+        module_path_dict.update(find_modules(path, seen, manifest))
+    return module_path_dict
 
-    print()
+class LazyMod:
+    """
+    A mod in a module that hasn't been imported yet. PySweep keeps these
+    around when it's started with lazy=True and calls load the first time the
+    mod is needed.
 
-    name_module_dict = import_modules(module_path_dict)
+    triggers and listens are what pysweep.mod.describe said about the mod's
+    class when its module was last imported.
+    """
+    def __init__(self, name, modulename, description, module_path_dict):
+        self.name = name
+        self.modulename = modulename
+        self.triggers = description['triggers']
+        self.listens = [(funcname, mod, from_json(trigger), deferred)
+            for funcname, mod, trigger, deferred in description['listens']]
+        self.module_path_dict = module_path_dict
 
-    name_mod_dict = load_mods(name_module_dict)
+    def load(self):
+        """
+        Imports the module (and the mod modules it imports) if that hasn't
+        happened yet, and returns a new instance of the mod.
+        """
+        module = import_with_dependencies(self.modulename, self.module_path_dict)
+        return getattr(module, self.name)()
 
-    return name_mod_dict
+def import_with_dependencies(name, module_path_dict, importing=None):
+    """
+    Imports the module name from module_path_dict after the modules it
+    imports, unless it's already imported. Returns the module.
+
+    Raises ImportError if name is in an import cycle (import_modules leaves
+    those out, see import_order). importing is the list of modules whose
+    dependencies are being imported, which is how the cycle is found.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if importing is None:
+        importing = []
+    if name in importing:
+        cycle = importing[importing.index(name):]
+        raise ImportError("Import cycle: {}".format(" -> ".join(cycle + [name])))
+    importing.append(name)
+    path, type_ = module_path_dict[name]
+    for dependency in sorted(find_dependencies(name, path, type_, module_path_dict)):
+        import_with_dependencies(dependency, module_path_dict, importing)
+    importing.pop()
+    print("Importing: {}".format(name))
+    with pysweep.startup.measure(name, 'import'):
+        return import_module(name, path, type_)
+
+def from_json(value):
+    """
+    Triggers can be tuples, which come back from JSON as lists.
+    """
+    if isinstance(value, list):
+        return tuple(from_json(item) for item in value)
+    return value
+
+def record_module(manifest, modulename, module, path, type_):
+    """
+    Remember what mods are in module, and what they trigger and listen to, in
+    the manifest so the module doesn't have to be imported to find out.
+    """
+    mods = {}
+    for modname, modclass in module_classes(module):
+        if (not issubclass(modclass, pysweep.mod.Mod) or modclass == pysweep.mod.Mod
+                or not pysweep.mod.ismod(modclass)[0]):
+            continue
+        if modclass.__module__ != modulename and not modclass.__module__.startswith(modulename + '.'):
+            continue # Imported from some other module
+        mods[modname] = pysweep.mod.describe(modclass)
+    try:
+        entry = json.loads(json.dumps({'stamp': module_stamp(path, type_), 'mods': mods}))
+    except (TypeError, ValueError):
+        return # Triggers that aren't plain data, the module will just always be imported.
+    if manifest['modules'].get(path) != entry:
+        manifest['modules'][path] = entry
+        manifest['dirty'] = True
+
+def module_sources(path, type_):
+    """
+    Returns the paths of the source files of a module: the file itself, or
+    every .py file in a package.
+    """
+    if type_ != PKG_DIRECTORY:
+        return [path]
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        sources.extend(os.path.join(dirpath, f) for f in sorted(filenames) if f.endswith('.py'))
+    return sources
+
+def module_stamp(path, type_):
+    """
+    Something that changes when any source file of the module changes.
+    """
+    stamp = []
+    for source in module_sources(path, type_):
+        try:
+            st = os.stat(source)
+        except OSError:
+            continue
+        stamp.append([source, st.st_mtime_ns, st.st_size])
+    return stamp
+
+def load_manifest(path):
+    """
+    The discovery manifest maps each mod directory to the modules found in
+    it, along with the identity (device, inode) and mtime of every directory
+    that was looked at. If none of those directories changed, adding or
+    removing a module can't have happened, so the walk can be skipped.
+
+    It also maps the path of every module load_mods_lazily imported from a
+    lazy path to the mods in it (see record_module), and every mod source
+    file to the modules it imports (see source_imports).
+
+    Returns an empty manifest if there isn't a usable one.
+    """
+    try:
+        with open(os.path.expanduser(path)) as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION and all(key in manifest for key in ('roots', 'modules', 'imports')):
+            manifest['dirty'] = False
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': MANIFEST_VERSION, 'roots': {}, 'modules': {}, 'imports': {}, 'dirty': False}
+
+def save_manifest(path, manifest):
+    if not manifest['dirty']:
+        return
+    path = os.path.expanduser(path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({key: manifest[key] for key in ('version', 'roots', 'modules', 'imports')}, f)
+        os.replace(path + '.tmp', path)
+        manifest['dirty'] = False
+    except OSError as e:
+        print("Could not save mod discovery manifest {}: {}".format(path, e))
+
+def manifest_entry_valid(entry):
+    for path, dev, ino, mtime in entry['dirs']:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_dev != dev or st.st_ino != ino or st.st_mtime_ns != mtime:
+            return False
+    return True
 
 def is_package_module(path):
     return os.path.isfile(os.path.join(path, '__init__.py'))
@@ -42,107 +277,278 @@ def ignore_dir(path):
 def ignore_file(path):
     return os.path.basename(path).startswith(".")
 
-def find_modules(path):
+def find_modules(path, seen=None, manifest=None):
     """
     Finds modules in path.
 
     Returns a dict where the keys are the names of the modules (file/directory
     names) and the values are the paths to the modules.
+
+    seen is a set of (st_dev, st_ino) of modules already found elsewhere,
+    which are skipped (and it's updated with the new ones). If a manifest
+    (see load_manifest) is given, the walk is skipped when nothing changed
+    since it was recorded, and the manifest is updated otherwise.
     """
-    return find_modules_r(path)[0]
+    if seen is None:
+        seen = set()
+    root = os.path.abspath(path)
+
+    entry = None
+    if manifest is not None:
+        entry = manifest['roots'].get(root)
+        if entry is not None and not manifest_entry_valid(entry):
+            entry = None
+    cached = entry is not None
+    if not cached:
+        entry = {'dirs': [], 'modules': []}
+        find_modules_r(root, os.stat(root), set(), entry['dirs'], entry['modules'])
+        if manifest is not None:
+            manifest['roots'][root] = entry
+            manifest['dirty'] = True
+
+    module_path_dict = {}
+    for modulename, module_path, type_, dev, ino in entry['modules']:
+        if (dev, ino) in seen:
+            print("Already found: {}".format(module_path))
+            continue
+        seen.add((dev, ino))
+        module_path_dict[modulename] = (module_path, type_)
+    print("Found {} modules in {}{}".format(len(module_path_dict), path, " (unchanged)" if cached else ""))
+    return module_path_dict
 
-def find_modules_r(path, alreadyfound=[]):
+def find_modules_r(path, st, seen, dirs, found):
     """
     Finds modules in path recursively.
 
-    Here we use alreadyfound to keep track of files/directories we've seen.
-    The second value in the return tuple is the updated alreadyfound.
+    st is the os.stat of path. seen is a set of the (st_dev, st_ino) of
+    everything we've already looked at, so symlinks can't make us find
+    something twice. Every directory whose contents decide what gets found
+    is added to dirs as [path, st_dev, st_ino, st_mtime_ns], and every module
+    to found as [name, path, type, st_dev, st_ino].
     """
-    module_path_dict = {}
+    dirs.append([path, st.st_dev, st.st_ino, st.st_mtime_ns])
+    with os.scandir(path) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
 
-    for module_path in os.listdir(path):
-        module_path = os.path.join(path, module_path)
+    for entry in entries:
+        module_path = entry.path
 
-        if os.path.isdir(module_path) and not ignore_dir(module_path):
+        if entry.is_dir() and not ignore_dir(module_path):
             # DIRECTORY
-            for found in alreadyfound:
-                if os.path.samefile(module_path, found):
-                    print("Already found: {}".format(module_path))
-                    break
+            st = entry.stat()
+            if (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+            if is_package_module(module_path):
+                # Listed in dirs as well, so removing __init__.py is noticed.
+                dirs.append([module_path, st.st_dev, st.st_ino, st.st_mtime_ns])
+                found.append([entry.name, module_path, PKG_DIRECTORY, st.st_dev, st.st_ino])
             else:
-                # this module is not yet found
-                print("Found: {}".format(module_path))
-                alreadyfound.append(module_path)
-                if is_package_module(module_path):
-                    modulename = os.path.basename(module_path)
-                    module_path_dict[modulename] = (module_path, imp.PKG_DIRECTORY)
-                else:
-                    # Was not a package module, recurse to find more modules inside
-                    recurse = find_modules_r(module_path, alreadyfound)
-                    module_path_dict.update(recurse[0])
-                    alreadyfound = recurse[1]
-
-        elif os.path.isfile(module_path) and not ignore_file(module_path):
+                # Was not a package module, recurse to find more modules inside
+                find_modules_r(module_path, st, seen, dirs, found)
+
+        elif entry.is_file() and not ignore_file(module_path) and is_file_module(module_path):
             # FILE
-            for found in alreadyfound:
-                if os.path.samefile(module_path, found):
-                    print("Already found: {}".format(module_path))
-                    break
-            else:
-                # this module is not yet found
-                print("Found: {}".format(module_path))
-                alreadyfound.append(module_path)
-                if is_file_module(module_path):
-                    modulename = os.path.basename(module_path)[:-3]
-                    module_path_dict[modulename] = (module_path, imp.PY_SOURCE)
-    return (module_path_dict, alreadyfound)
+            st = entry.stat()
+            if (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+            found.append([entry.name[:-3], module_path, PY_SOURCE, st.st_dev, st.st_ino])
 
-def import_modules(module_path_dict):
+def import_modules(module_path_dict, manifest=None):
     """
     Returns a dict where the keys are the module names and the values are the
     modules.
+
+    Mods can import each other, so before importing anything we look at their
+    import statements (see find_dependencies) and import them in dependency
+    order, each exactly once. Mods in an import cycle, mods that fail to
+    import and mods depending on either of those are reported and left out.
+
+    If a manifest (see load_manifest) is given, the import statements of
+    source files that haven't changed are taken from it.
     """
+    dependencies = {}
+    for name in sorted(module_path_dict):
+        path, type_ = module_path_dict[name]
+        dependencies[name] = find_dependencies(name, path, type_, module_path_dict, manifest)
+
+    order, cycles, blocked = import_order(dependencies)
+
+    failed = set()
+    for cycle in cycles:
+        print("Import cycle: {}".format(" -> ".join(cycle + [cycle[0]])))
+        failed.update(cycle)
+
+    start = time.perf_counter()
     name_module_dict = {}
-    modules_to_load = set(module_path_dict.keys())
-    while modules_to_load:
-        loaded_at_least_one = False
-        modules_loaded = set()
-        exceptions = []
-        for name in modules_to_load:
-            try:
-                print("Importing: {} ... ".format(name), end="")
-                path, type_ = module_path_dict[name]
+    for name in order + blocked:
+        missing = sorted(dep for dep in dependencies[name] if dep in failed)
+        if missing:
+            print("Importing: {} ... skip (needs {})".format(name, ", ".join(missing)))
+            failed.add(name)
+            continue
+        try:
+            print("Importing: {} ... ".format(name), end="")
+            path, type_ = module_path_dict[name]
+            with pysweep.startup.measure(name, 'import'):
                 name_module_dict[name] = (import_module(name, path, type_), path)
-                loaded_at_least_one = True
-                modules_loaded.add(name)
-                print("done")
-            except:
-                # It's possible it tried to import another mod that hasn't been imported.
-                # skip it first and try again later.
-                exceptions.append(traceback.format_exc())
-                print("skip")
-                continue
-        if loaded_at_least_one:
-            modules_to_load -= modules_loaded
-        else:
-            print("Failed modules: {}".format(modules_to_load))
-            for e in exceptions:
-                print(e)
-            break
+            print("done")
+        except:
+            print("failed")
+            traceback.print_exc()
+            failed.add(name)
+    print("Imported {} modules in {:.1f} ms".format(len(name_module_dict), (time.perf_counter() - start) * 1000))
+    if failed:
+        print("Failed modules: {}".format(", ".join(sorted(failed))))
     print()
     return name_module_dict
 
+def import_order(dependencies):
+    """
+    dependencies is a dict of module name -> set of names of the modules it
+    imports (only ones that are keys of dependencies).
+
+    Returns (order, cycles, blocked). order has every module that isn't stuck
+    behind a cycle, each after everything it depends on (ties are broken by
+    name so the order is stable). cycles is a list of import cycles, each a
+    list of names. blocked is every other module: those depending on a cycle,
+    each after a module it depends on that is either in a cycle or blocked
+    itself.
+    """
+    dependents = {name: [] for name in dependencies}
+    waiting_on = {}
+    for name, deps in dependencies.items():
+        waiting_on[name] = len(deps)
+        for dep in deps:
+            dependents[dep].append(name)
+
+    ready = [name for name, count in waiting_on.items() if count == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        name = heapq.heappop(ready)
+        order.append(name)
+        for dependent in dependents[name]:
+            waiting_on[dependent] -= 1
+            if waiting_on[dependent] == 0:
+                heapq.heappush(ready, dependent)
+
+    # Whatever is left depends on something that's left, so following
+    # dependencies from any of them has to run into a cycle eventually.
+    left = sorted(name for name, count in waiting_on.items() if count)
+    cycles = []
+    blocked = []
+    done = set()
+    for start in left:
+        path = []
+        on_path = {}
+        name = start
+        while name not in done and name not in on_path:
+            on_path[name] = len(path)
+            path.append(name)
+            name = min(dep for dep in dependencies[name] if waiting_on[dep])
+        # Each module on the path depends on the one after it, so they go
+        # in backwards: by the time one is imported (or skipped) the one it
+        # depends on has already been found to fail.
+        if name in on_path:
+            cycles.append(path[on_path[name]:])
+            blocked.extend(reversed(path[:on_path[name]]))
+        else:
+            blocked.extend(reversed(path))
+        done.update(path)
+    return order, cycles, blocked
+
+def find_dependencies(name, path, type_, module_path_dict, manifest=None):
+    """
+    Returns the set of modules in module_path_dict (other than name itself)
+    that the module at path imports when it's imported. For packages, every
+    .py file in the package is looked at.
+
+    Imports inside functions don't count, they happen after everything is
+    imported. Neither do relative imports, which can't refer to other mods.
+    """
+    dependencies = set()
+    for source in module_sources(path, type_):
+        for imported in source_imports(source, manifest):
+            if imported != name and imported in module_path_dict:
+                dependencies.add(imported)
+    return dependencies
+
+def source_imports(source, manifest=None):
+    """
+    Returns the names imported_names finds in the source file. Parsing is
+    most of the cost of importing a mod whose bytecode is cached, so the
+    result is remembered in the manifest (if given) along with the file's
+    mtime and size.
+    """
+    try:
+        st = os.stat(source)
+    except OSError:
+        return []
+    if manifest is not None:
+        cached = manifest['imports'].get(source)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+    try:
+        with open(source, 'rb') as f:
+            names = sorted(set(imported_names(ast.parse(f.read(), source))))
+    except (OSError, SyntaxError, ValueError):
+        # Importing it will fail and say why, nothing to add here.
+        return []
+    if manifest is not None:
+        manifest['imports'][source] = [st.st_mtime_ns, st.st_size, names]
+        manifest['dirty'] = True
+    return names
+
+def imported_names(node):
+    """
+    Yields the top level names of the modules imported by absolute import
+    statements in node that run at import time.
+    """
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, ast.Import):
+            for alias in child.names:
+                yield alias.name.partition('.')[0]
+        elif isinstance(child, ast.ImportFrom):
+            if child.level == 0 and child.module:
+                yield child.module.partition('.')[0]
+        elif not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            yield from imported_names(child)
+
+def module_location(module):
+    """
+    Returns the (path, type) find_modules would have given for an imported
+    module.
+    """
+    if hasattr(module, '__path__'):
+        return os.path.dirname(module.__file__), PKG_DIRECTORY
+    return module.__file__, PY_SOURCE
+
 def import_module(name, path, type_):
     """
-    Returns the module pointed to by the path.
+    Returns the module pointed to by the path, imported as name.
+
+    This goes through importlib's source loader, so the compiled bytecode is
+    cached in __pycache__ next to the source and reused as long as the
+    source's mtime and size still match. Submodules of packages are found
+    through the package's __path__ and cached the same way.
     """
-    if type_ == imp.PY_SOURCE:
-        with open(path) as module:
-            module = imp.load_module(name, module, path, ('.py', 'U', type_))
-    elif type_ == imp.PKG_DIRECTORY:
-        module = imp.load_module(name, None, path, ('', '', type_))
+    if type_ == PY_SOURCE:
+        spec = importlib.util.spec_from_file_location(name, path)
+    elif type_ == PKG_DIRECTORY:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(path, '__init__.py'),
+            submodule_search_locations=[path])
     else:
         raise TypeError('Unsupported module type')
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except:
+        if sys.modules.get(name) is module:
+            del sys.modules[name]
+        raise
     return module
 
 def load_mods(name_module_dict):
@@ -157,18 +563,36 @@ def load_mods(name_module_dict):
     name_mod_dict = {}
 
     for modulename, (module, path) in name_module_dict.items():
-        print("Loading mods in module: {}".format(modulename))
-        class_list = [m for m in
-            inspect.getmembers(module, predicate=inspect.isclass)
-            if issubclass(m[1], pysweep.mod.Mod) and m[1] != pysweep.mod.Mod]
-        for modname, modclass in class_list:
-            ismod, missing = pysweep.mod.ismod(modclass)
-            if not ismod:
-                print("Class '{}' in '{}' is not a mod as it is missing the following functions, skipping. (Found in: {}) Missing: {}".format(modname, modulename, path, missing))
-                continue
-            print("  Loading mod: {} ... ".format(modname), end="")
+        name_mod_dict.update(load_mods_from(modulename, module, path))
+
+    return name_mod_dict
+
+def module_classes(module):
+    """
+    Returns (name, class) for every class in the module's namespace, sorted
+    by name.
+    """
+    return sorted((name, value) for name, value in vars(module).items() if isinstance(value, type))
+
+def load_mods_from(modulename, module, path):
+    """
+    Returns a dict of mod names and instances of the mods in one module.
+    """
+    name_mod_dict = {}
+
+    print("Loading mods in module: {}".format(modulename))
+    class_list = [m for m in
+        module_classes(module)
+        if issubclass(m[1], pysweep.mod.Mod) and m[1] != pysweep.mod.Mod]
+    for modname, modclass in class_list:
+        ismod, missing = pysweep.mod.ismod(modclass)
+        if not ismod:
+            print("Class '{}' in '{}' is not a mod as it is missing the following functions, skipping. (Found in: {}) Missing: {}".format(modname, modulename, path, missing))
+            continue
+        print("  Loading mod: {} ... ".format(modname), end="")
+        with pysweep.startup.measure(modname, '__init__'):
             mod = modclass()
-            name_mod_dict[modname] = mod
-            print("done")
+        name_mod_dict[modname] = mod
+        print("done")
 
     return name_mod_dict
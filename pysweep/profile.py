@@ -0,0 +1,188 @@
+"""
+Per-listener latency profiling for the mod event system.
+
+A ListenerProfiler is an instrument (see PySweep.add_instrument): while it's
+added, every listener a compiled trigger binds gets wrapped in a function that
+times it. When it's removed the triggers bind the bare listeners again, so
+there is no cost at all while profiling is off.
+"""
+
+import json
+import time
+
+def listener_name(listener):
+    """
+    A readable name for a listener, like 'ClickManager.listen'.
+    """
+    deferred = getattr(listener, 'pysweep_deferred', None)
+    if deferred is not None:
+        return listener_name(deferred) + ' (deferred)'
+    filtered = getattr(listener, 'pysweep_filtered', None)
+    if filtered is not None:
+        return listener_name(filtered) + ' (filtered)'
+    owner = getattr(listener, '__self__', None)
+    if owner is not None:
+        return '{}.{}'.format(type(owner).__name__, listener.__name__)
+    return getattr(listener, '__qualname__', repr(listener))
+
+def text_table(header, rows):
+    """
+    Returns header and rows (tuples of strings) as a text table: the first
+    two columns are names and line up on the left, the rest are numbers and
+    line up on the right.
+    """
+    widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header))]
+    lines = []
+    for row in [header] + rows:
+        lines.append('  '.join([row[0].ljust(widths[0]), row[1].ljust(widths[1])] +
+            [cell.rjust(width) for cell, width in zip(row[2:], widths[2:])]))
+    return '\n'.join(lines)
+
+class Histogram:
+    """
+    Log-linear histogram of durations in nanoseconds, in the style of
+    HdrHistogram.
+
+    Values below 2**(precision+1) are counted exactly. Bigger values are
+    counted in buckets that split each power of two into 2**precision equal
+    parts, so any percentile is off by less than 1 part in 2**precision.
+    """
+    def __init__(self, precision=5):
+        self.precision = precision
+        self.counts = {} # Lowest value in bucket: count
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        shift = value.bit_length() - self.precision - 1
+        if shift > 0:
+            bucket = value >> shift << shift
+        else:
+            bucket = value
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """
+        Returns the highest value that is equivalent (within the precision)
+        to the value at percentile p (0 to 100).
+        """
+        if self.count == 0:
+            return 0
+        target = max(1, -(-self.count * p // 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                shift = bucket.bit_length() - self.precision - 1
+                if shift > 0:
+                    return min(bucket + (1 << shift) - 1, self.max)
+                return bucket
+        return self.max
+
+    def mean(self):
+        if self.count == 0:
+            return 0
+        return self.total / self.count
+
+class ListenerStats:
+    def __init__(self, trigger, listener):
+        self.trigger = trigger
+        self.listener = listener
+        self.histogram = Histogram()
+        self.exceptions = 0
+
+    def as_dict(self):
+        h = self.histogram
+        return {
+            'trigger': self.trigger,
+            'listener': self.listener,
+            'calls': h.count,
+            'total_ns': h.total,
+            'mean_ns': h.mean(),
+            'p50_ns': h.percentile(50),
+            'p99_ns': h.percentile(99),
+            'max_ns': h.max or 0,
+            'exceptions': self.exceptions,
+        }
+
+class ListenerProfiler:
+    """
+    Records call count, total time, latency percentiles and exceptions per
+    (trigger, listener) pair. Times include everything the listener caused
+    synchronously, like the listeners of triggers it fired.
+    """
+    def __init__(self):
+        self.stats = {}
+
+    def wrap(self, modname, trigger, listener):
+        triggername = '{}.{}'.format(modname, trigger)
+        name = listener_name(listener)
+        try:
+            stats = self.stats[(triggername, name)]
+        except KeyError:
+            stats = self.stats[(triggername, name)] = ListenerStats(triggername, name)
+        record = stats.histogram.record
+        clock = time.perf_counter_ns
+        def profiled(event):
+            start = clock()
+            try:
+                listener(event)
+            except:
+                stats.exceptions += 1
+                raise
+            finally:
+                record(clock() - start)
+        return profiled
+
+    def reset(self):
+        self.stats = {}
+
+    def as_list(self):
+        """
+        Returns the stats as a list of dicts, most total time first.
+        """
+        return sorted((s.as_dict() for s in self.stats.values()),
+            key=lambda s: s['total_ns'], reverse=True)
+
+    def to_json(self):
+        return json.dumps(self.as_list(), indent=2)
+
+    def dump_json(self, path):
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+
+    def table(self):
+        """
+        Returns the stats as a text table, most total time first.
+        """
+        rows = [(
+            s['trigger'],
+            s['listener'],
+            '{:,}'.format(s['calls']),
+            '{:.3f}'.format(s['total_ns'] / 1e6),
+            '{:.1f}'.format(s['p50_ns'] / 1e3),
+            '{:.1f}'.format(s['p99_ns'] / 1e3),
+            '{:,}'.format(s['exceptions']),
+        ) for s in self.as_list()]
+        header = ('trigger', 'listener', 'calls', 'total ms', 'p50 us', 'p99 us', 'exceptions')
+        return text_table(header, rows)
+
+def dump(profiler, json_path=None):
+    """
+    Print the profiler's table, and write it as JSON too if json_path is set.
+    Used by main.py and console.py on exit.
+    """
+    print()
+    print("Listener profile:")
+    print(profiler.table())
+    if json_path is not None:
+        profiler.dump_json(json_path)
+        print("Wrote listener profile to {}".format(json_path))
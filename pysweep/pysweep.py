@@ -3,44 +3,269 @@ The core engine PySweeper runs on. This will load modules and set up the
 most basic of interactions between them.
 """
 
+import time
 import traceback
 
+import pysweep.memory
+import pysweep.mod
 import pysweep.modloader
+import pysweep.startup
+from pysweep.journal import Journal
+from pysweep.runqueue import RunQueue
+from pysweep.inject import InjectionQueue
+
+class ModTable(dict):
+    """
+    The type of PySweep.mods. Looking up a lazy mod that hasn't been started
+    yet, with mods[modname] or mods.get(modname), starts it. modname in mods
+    is True for it as well, without starting it.
+
+    Everything else (len, iterating, keys, values and items) only sees the
+    mods that have been started, so going through all the mods doesn't start
+    every lazy one.
+    """
+    def __init__(self, pysweep, mods):
+        dict.__init__(self, mods)
+        self.pysweep = pysweep
+
+    def __missing__(self, modname):
+        return self.pysweep.activate(modname)
+
+    def __contains__(self, modname):
+        return dict.__contains__(self, modname) or modname in self.pysweep.lazy
+
+    def get(self, modname, default=None):
+        try:
+            return self[modname]
+        except KeyError:
+            return default
+
+    def started(self, modname):
+        """
+        Like modname in self, but False for lazy mods that haven't been
+        started yet.
+        """
+        return dict.__contains__(self, modname)
 
 class PySweep:
-    def __init__(self, master):
+    def __init__(self, master, compile_triggers=True, journal_capacity=4096, dispatch='sync', mods=None, lazy=False, account_memory=False):
+        """
+        compile_triggers: Once every mod is listening, replace each trigger
+        with a version that has its listeners precompiled into a fan-out, so
+        firing it does no dict lookups. Set to False to use the plain
+        @mod.trigger wrappers (handy when debugging a mod).
+
+        journal_capacity: How many of the most recent EventNodes are kept so
+        mods can look at what caused an event (see pysweep.journal).
+
+        dispatch: 'sync' calls listeners from inside the trigger, 'deferred'
+        puts the calls on self.runqueue, which runs them breadth-first from
+        a Tk idle callback. Listeners can override this with
+        @mod.listen(..., deferred=True/False).
+
+        mods: A dict of mod names and mod instances to use instead of loading
+        them from the mod directories (used by the benchmarks).
+
+        lazy: Don't import or start the mods in ~/.pysweeper/mods until
+        they're needed: when a trigger they listen to first fires, or when
+        another mod looks them up in self.mods. Mods that don't listen to
+        anything, and mods the discovery manifest hasn't seen yet, are still
+        started straight away. If mods is given, lazy can be a dict of mod
+        names and pysweep.modloader.LazyMods to go with it.
+
+        account_memory: Start tracing allocations before loading the mods,
+        so memory_report can see everything they allocate. Otherwise tracing
+        only starts with the first memory_report.
+        """
+        if dispatch not in ('sync', 'deferred'):
+            raise ValueError("dispatch must be 'sync' or 'deferred', not {!r}".format(dispatch))
+
+        self.memory = None # pysweep.memory.MemoryAccounting, see memory_report
+        if account_memory:
+            self.memory = pysweep.memory.MemoryAccounting()
+
         self.master = master
+        self.compile_triggers = compile_triggers
+        self.journal = Journal(journal_capacity)
+        self.deferred_dispatch = dispatch == 'deferred'
+        self.runqueue = RunQueue(master)
+        self.instruments = []
+        self.injections = InjectionQueue(master)
+
+        # The init phases every mod goes through, in order. self.phase is
+        # the index of the one that is running (or ran last).
+        self.phases = ['pysweep_init', 'pysweep_triggers_init', 'pysweep_listeners_init']
+        if compile_triggers:
+            self.phases.append('pysweep_triggers_compile')
+        self.phases += ['pysweep_before_finish_init', 'pysweep_finish_init']
+        self.phase = -1
+
+        # Lazy mods: name -> pysweep.modloader.LazyMod, and the stand-in
+        # listeners that wake them up (see listen_lazily).
+        self.lazy = {}
+        self.lazy_listens = {}
+        self.lazy_stubs = {}
 
-        self.mods = pysweep.modloader.load_mods_in("mods", "~/.pysweeper/mods")
+        if mods is None and lazy:
+            mods, self.lazy = pysweep.modloader.load_mods_lazily(("mods",), ("~/.pysweeper/mods",))
+        elif isinstance(lazy, dict):
+            self.lazy = dict(lazy)
+        elif mods is None:
+            mods = pysweep.modloader.load_mods_in("mods", "~/.pysweeper/mods")
+        self.mods = ModTable(self, mods)
+
+        for lazyname, lazymod in self.lazy.items():
+            seen = set()
+            for funcname, modname, trigger, deferred in lazymod.listens:
+                if (modname, trigger) not in seen:
+                    seen.add((modname, trigger))
+                    self.lazy_listens.setdefault(modname, []).append((lazyname, trigger))
 
         print()
         print("Loading mods: {}".format(list(self.mods.keys())))
         print()
-        mods_to_delete = []
-        for modname, mod in self.mods.items():
-            try: mod.pysweep_init(self)
-            except Exception as e: traceback.print_exc(); mods_to_delete.append(modname);
-        for modname in mods_to_delete: del self.mods[modname]
-        mods_to_delete = []
-        for modname, mod in self.mods.items():
-            try: mod.pysweep_triggers_init()
-            except Exception as e: traceback.print_exc(); mods_to_delete.append(modname);
-        for modname in mods_to_delete: del self.mods[modname]
-        mods_to_delete = []
-        for modname, mod in self.mods.items():
-            try: mod.pysweep_listeners_init()
-            except Exception as e: traceback.print_exc(); mods_to_delete.append(modname);
-        for modname in mods_to_delete: del self.mods[modname]
-        mods_to_delete = []
-        for modname, mod in self.mods.items():
-            try: mod.pysweep_before_finish_init()
-            except Exception as e: traceback.print_exc(); mods_to_delete.append(modname);
-        for modname in mods_to_delete: del self.mods[modname]
-        mods_to_delete = []
-        for modname, mod in self.mods.items():
-            try: mod.pysweep_finish_init()
-            except Exception as e: traceback.print_exc(); mods_to_delete.append(modname);
-        for modname in mods_to_delete: del self.mods[modname]
+        for self.phase, phase in enumerate(self.phases):
+            for modname in self.run_phase(phase, list(self.mods.items())):
+                del self.mods[modname]
+            if phase == 'pysweep_listeners_init':
+                for modname in list(self.mods.keys()):
+                    self.listen_lazily(modname)
 
         print()
         print("Successfully loaded: {}".format(list(self.mods.keys())))
+        pysweep.startup.report()
+
+        if master is not None:
+            self.injections.start()
+
+    def run_phase(self, phase, mods):
+        """
+        Calls the init phase (a method name from self.phases) of every
+        (modname, mod) in mods. Returns the names of the mods that raised.
+        """
+        failed = []
+        for modname, mod in mods:
+            try:
+                with pysweep.startup.measure(modname, phase):
+                    if phase == 'pysweep_init':
+                        mod.pysweep_init(self)
+                    else:
+                        getattr(mod, phase)()
+            except Exception as e:
+                traceback.print_exc()
+                failed.append(modname)
+        return failed
+
+    def activate(self, modname):
+        """
+        Start the lazy mod modname now, taking it through the init phases
+        everything else has already been through. Returns the mod.
+
+        Raises KeyError if there is no such lazy mod or it failed to start.
+        """
+        lazymod = self.lazy.pop(modname)
+        for target, trigger, stub in self.lazy_stubs.pop(modname, ()):
+            if self.mods.started(target):
+                self.mods[target].pysweep_unregister(trigger, stub)
+
+        print("Activating mod: {}".format(modname))
+        start = time.perf_counter()
+        try:
+            with pysweep.startup.measure(modname, '__init__'):
+                mod = lazymod.load()
+        except Exception as e:
+            traceback.print_exc()
+            raise KeyError(modname)
+        self.mods[modname] = mod
+        for phase in self.phases[:self.phase + 1]:
+            if self.run_phase(phase, [(modname, mod)]):
+                del self.mods[modname]
+                self.lazy_listens.pop(modname, None)
+                raise KeyError(modname)
+            if phase == 'pysweep_listeners_init':
+                self.listen_lazily(modname)
+        print("Activated mod: {} ({:.1f} ms)".format(modname, (time.perf_counter() - start) * 1000))
+        return mod
+
+    def listen_lazily(self, modname):
+        """
+        Called once modname is listening to everything it wants to. Registers
+        a stand-in listener on modname for every trigger of it a lazy mod
+        listens to. The first stand-in to be called starts the lazy mod
+        (which removes all its stand-ins) and hands it the event.
+
+        The stand-ins are never deferred themselves: whether the event is
+        deferred is up to the listener it's handed to.
+        """
+        for lazyname, trigger in self.lazy_listens.pop(modname, ()):
+            if lazyname not in self.lazy:
+                continue
+            stub = self.lazy_listener(lazyname, modname, trigger)
+            try:
+                self.mods[modname].pysweep_register(trigger, stub, deferred=False)
+            except Exception as e:
+                traceback.print_exc()
+                continue
+            self.lazy_stubs.setdefault(lazyname, []).append((modname, trigger, stub))
+
+    def lazy_listener(self, lazyname, modname, trigger):
+        funcnames = {funcname for funcname, m, t, deferred in self.lazy[lazyname].listens
+            if (m, t) == (modname, trigger)}
+        def listener(event):
+            try:
+                mod = self.mods[lazyname]
+            except KeyError:
+                return
+            # The mod only just registered its own listeners, so they missed
+            # this event. Hand it to them the way the compiled trigger will
+            # from now on: filtered, deferred and instrumented.
+            instruments = tuple(self.instruments)
+            for registered in list(self.mods[modname].pysweep_triggers[trigger]):
+                func = pysweep.mod.registered_func(registered)
+                if getattr(func, '__self__', None) is mod and func.__name__ in funcnames:
+                    pysweep.mod.bind_listener(registered, modname, trigger, instruments)(event)
+        return listener
+
+    def inject(self, func, *args, block=True, timeout=None):
+        """
+        Call func(*args) on the Tk thread soon. This is the only PySweep
+        method that is safe to call from other threads; use it to post the
+        results of work done on a worker thread, e.g.
+        pysweep.inject(mod.on_board_generated, event, board).
+        """
+        self.injections.put(func, *args, block=block, timeout=timeout)
+
+    def memory_report(self, limit=10):
+        """
+        Print the limit mod modules holding the most memory, and how much
+        that grew since the last report (see pysweep.memory). If memory
+        wasn't being traced yet, tracing starts now, so the first report only
+        has what was allocated since. Returns the records for all of them.
+        """
+        if self.memory is None:
+            self.memory = pysweep.memory.MemoryAccounting()
+        return self.memory.report(self.mods, limit)
+
+    def add_instrument(self, instrument):
+        """
+        Have every compiled trigger wrap its listeners with
+        instrument.wrap(modname, trigger, listener) from now on (for example a
+        pysweep.profile.ListenerProfiler or pysweep.trace.ChromeTracer).
+        Needs compiled triggers.
+        """
+        if not self.compile_triggers:
+            raise RuntimeError("Instruments need compiled triggers")
+        self.instruments.append(instrument)
+        self.invalidate_triggers()
+
+    def remove_instrument(self, instrument):
+        self.instruments.remove(instrument)
+        self.invalidate_triggers()
+
+    def invalidate_triggers(self):
+        """
+        Make every compiled trigger bind its listeners again next time it
+        fires.
+        """
+        for mod in self.mods.values():
+            mod.pysweep_triggers_invalidate()
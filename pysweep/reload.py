@@ -0,0 +1,182 @@
+"""
+Hot reloading of mods while PySweeper is running.
+
+A ModReloader polls the source files of the modules the running mods came
+from. When one changes, the module is imported again and its mods are
+replaced by new instances. So are the modules of running mods that import
+it (directly or through each other), since they'd otherwise keep using what
+they imported from the old one, like classes to compare events against. The
+new instances go through the init phases without restarting the other mods,
+which keep their state.
+
+Things a reload can't fix up:
+- references other mods took to the old instances or their attributes
+- listeners registered by hand instead of with @mod.listen
+"""
+
+import sys, time, traceback, types
+
+import pysweep.modloader
+
+def listeners_of(mod):
+    """
+    Yields (listener, modname, trigger, options) for every @mod.listen on the
+    methods of mod. listener is what pysweep_listeners_init registered.
+    """
+    for funcname, modname, trigger, options in type(mod).pysweep_listeners:
+        yield types.MethodType(getattr(type(mod), funcname), mod), modname, trigger, options
+
+class ModReloader:
+    def __init__(self, pysweep, interval=500):
+        """
+        interval: ms between checks for changed source files.
+        """
+        self.pysweep = pysweep
+        self.interval = interval
+        self.running = False
+        self.stamps = {} # module name: pysweep.modloader.module_stamp
+        self.reloads = [] # (module name, seconds) for every reload
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.check() # Only remembers the stamps, nothing has changed yet
+            self.pysweep.master.after(self.interval, self.tick)
+
+    def stop(self):
+        self.running = False
+
+    def tick(self):
+        if not self.running:
+            return
+        try:
+            self.check()
+        except Exception:
+            traceback.print_exc()
+        self.pysweep.master.after(self.interval, self.tick)
+
+    def modules(self):
+        """
+        Returns a dict of the names of the modules the running mods came from
+        and their (path, type).
+        """
+        modules = {}
+        for mod in self.pysweep.mods.values():
+            name = type(mod).__module__.partition('.')[0]
+            module = sys.modules.get(name)
+            if getattr(module, '__file__', None) is not None:
+                modules[name] = pysweep.modloader.module_location(module)
+        return modules
+
+    def check(self):
+        """
+        Reload every module whose source changed since the last check.
+        """
+        modules = self.modules()
+        changed = []
+        for name, (path, type_) in modules.items():
+            stamp = pysweep.modloader.module_stamp(path, type_)
+            old = self.stamps.get(name)
+            self.stamps[name] = stamp
+            if old is not None and old != stamp:
+                changed.append(name)
+        reloaded = set()
+        for name in changed:
+            if name not in reloaded: # Already reloaded as a dependent
+                reloaded.update(self.dependents(name, modules))
+                self.reload(name, *modules[name])
+
+    def dependents(self, name, modules):
+        """
+        Returns the set of name and the modules in modules (see self.modules)
+        that import it, directly or through each other.
+        """
+        imports = {modulename: pysweep.modloader.find_dependencies(modulename, path, type_, modules)
+            for modulename, (path, type_) in modules.items()}
+        names = {name}
+        grew = True
+        while grew:
+            grew = False
+            for modulename, dependencies in imports.items():
+                if modulename not in names and dependencies & names:
+                    names.add(modulename)
+                    grew = True
+        return names
+
+    def reload(self, name, path, type_):
+        """
+        Import the module name again, along with the modules of running mods
+        that import it (see dependents), and replace the running instances of
+        the mods in them. If importing them or creating the new mods fails,
+        the old ones are kept. Returns the dict of new mods.
+        """
+        start = time.perf_counter()
+        app = self.pysweep
+        modules = self.modules()
+        modules[name] = (path, type_)
+        names = self.dependents(name, modules)
+        inmodule = lambda modulename: modulename.partition('.')[0] in names
+
+        print()
+        print("Reloading: {}".format(", ".join(sorted(names))))
+        old_modules = {modulename: module for modulename, module in sys.modules.items() if inmodule(modulename)}
+        for modulename in old_modules:
+            del sys.modules[modulename]
+        try:
+            new_mods = {}
+            for modulename in sorted(names):
+                # After the modules it imports, so it gets the new ones
+                module = pysweep.modloader.import_with_dependencies(modulename, modules)
+                new_mods.update((modname, mod) for modname, mod in
+                    pysweep.modloader.load_mods_from(modulename, module, modules[modulename][0]).items()
+                    if inmodule(type(mod).__module__))
+        except Exception:
+            traceback.print_exc()
+            for modulename in [modulename for modulename in sys.modules if inmodule(modulename)]:
+                del sys.modules[modulename]
+            sys.modules.update(old_modules)
+            print("Reloading {} failed, keeping the running version".format(", ".join(sorted(names))))
+            return {}
+
+        old_mods = {modname: mod for modname, mod in app.mods.items() if inmodule(type(mod).__module__)}
+        for modname, mod in old_mods.items():
+            for listener, target, trigger, options in listeners_of(mod):
+                if app.mods.started(target):
+                    app.mods[target].pysweep_unregister(trigger, listener)
+            del app.mods[modname]
+            try:
+                mod.pysweep_unload()
+            except Exception:
+                traceback.print_exc()
+
+        # Lazy mods waiting on the old instances wait on the new ones instead.
+        for lazyname, lazymod in app.lazy.items():
+            for target, trigger in {(target, trigger)
+                    for funcname, target, trigger, deferred in lazymod.listens if target in new_mods}:
+                app.lazy_listens.setdefault(target, []).append((lazyname, trigger))
+
+        app.mods.update(new_mods)
+        for phase in app.phases[:app.phase + 1]:
+            for modname in app.run_phase(phase, list(new_mods.items())):
+                del app.mods[modname]
+                del new_mods[modname]
+            if phase == 'pysweep_triggers_init':
+                # Everyone else listening to the old instances listens to the
+                # new ones now.
+                for othername, other in list(app.mods.items()):
+                    if othername in new_mods:
+                        continue
+                    for listener, target, trigger, options in listeners_of(other):
+                        if target in new_mods:
+                            try:
+                                new_mods[target].pysweep_register(trigger, listener, **options)
+                            except Exception:
+                                traceback.print_exc()
+            if phase == 'pysweep_listeners_init':
+                for modname in new_mods:
+                    app.listen_lazily(modname)
+
+        elapsed = time.perf_counter() - start
+        self.reloads.append((name, elapsed))
+        print("Reloaded {} ({}) in {:.1f} ms".format(', '.join(sorted(names)), ', '.join(new_mods), elapsed * 1000))
+        return new_mods
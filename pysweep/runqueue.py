@@ -0,0 +1,94 @@
+"""
+The run queue used for deferred delivery of events to listeners.
+"""
+
+import collections
+
+from pysweep.event import release
+
+BATCH = 256 # Most calls run per drain, before letting Tk handle its events
+
+def call_and_release(func, event):
+    try:
+        func(event)
+    finally:
+        release(event)
+
+class RunQueue:
+    """
+    Calls queued up by triggers for their deferred listeners.
+
+    Instead of calling a deferred listener straight away (and so nesting one
+    more level for every trigger in a chain), the trigger puts the call in
+    here. The queue is drained from a single Tk idle callback, and calls
+    queued while draining go to the back of the queue, so chains of triggers
+    are run breadth-first with a constant stack depth.
+
+    A drain runs at most batch calls. If there are more, the rest is left for
+    another idle callback, so a chain of listeners that keeps queueing work
+    can't keep Tk from handling input and redrawing.
+    """
+    def __init__(self, master, batch=BATCH):
+        self.master = master
+        self.batch = batch
+        self.queue = collections.deque()
+        self.once = set() # Functions queued with call_once that haven't run yet
+        self.drain_queued = False
+
+    def put(self, func, *args):
+        self.queue.append((func, args))
+        if not self.drain_queued:
+            self.drain_queued = True
+            self.master.after_idle(self.drain)
+
+    def call_once(self, func):
+        """
+        Queue func() unless it's already queued. Use this for work like
+        redrawing that only needs to happen once no matter how many events
+        asked for it.
+        """
+        if func not in self.once:
+            self.once.add(func)
+            self.put(self._run_once, func)
+
+    def _run_once(self, func):
+        self.once.discard(func)
+        func()
+
+    def deferred(self, func):
+        """
+        Returns a listener that queues up a call to func with the event
+        instead of calling it. Pooled events are held until the call is made
+        (see pysweep.event.EventPool).
+        """
+        put = self.put
+        def listener(event):
+            pool = getattr(event, 'pysweep_pool', None)
+            if pool is None:
+                put(func, event)
+            else:
+                pool.hold(event)
+                put(call_and_release, func, event)
+        listener.pysweep_deferred = func
+        listener.pysweep_runqueue = self
+        return listener
+
+    def drain(self):
+        queue = self.queue
+        try:
+            for i in range(self.batch):
+                if not queue:
+                    break
+                func, args = queue.popleft()
+                func(*args)
+        finally:
+            # Only now, so calls put while draining don't queue up another
+            # drain each. If there's anything left (more than a batch, or a
+            # call raised), drain it later.
+            self.drain_queued = False
+            if queue:
+                self.drain_queued = True
+                self.master.after_idle(self.drain)
+
+    def __len__(self):
+        return len(self.queue)
@@ -0,0 +1,131 @@
+"""
+Startup profiling: how long importing each mod module and taking each mod
+through each init phase took, and how much memory it left allocated.
+
+Turned on by setting the environment variable PYSWEEP_PROFILE_STARTUP: to 1
+to print a report once PySweep has started, or to a path to also write the
+report there as JSON. When it isn't set, profiler is None and measure costs
+next to nothing.
+"""
+
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+
+import pysweep.memory
+import pysweep.profile
+
+ENVIRONMENT_VARIABLE = 'PYSWEEP_PROFILE_STARTUP'
+
+class StartupProfiler:
+    def __init__(self, json_path=None):
+        self.json_path = json_path
+        self.records = []
+        self.tracing = False # True if we started tracemalloc, and so stop it
+
+    def start_tracing(self):
+        """
+        Start tracemalloc, unless something else already did. It's started
+        with as many frames as pysweep.memory needs, so a MemoryAccounting
+        made while it's on can still tell the mods apart.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(pysweep.memory.FRAMES)
+            self.tracing = True
+
+    def keep_tracing(self):
+        """
+        Don't stop tracemalloc after the report, someone else needs it.
+        """
+        self.tracing = False
+
+    @contextlib.contextmanager
+    def measure(self, name, phase):
+        """
+        Records the wall time and the change in traced memory of the with
+        block as the phase of name (a mod, or a module for phase 'import').
+        Time spent in measure blocks nested inside counts for both.
+        """
+        self.start_tracing()
+        memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append({
+                'name': name,
+                'phase': phase,
+                'seconds': time.perf_counter() - start,
+                'bytes': tracemalloc.get_traced_memory()[0] - memory,
+            })
+
+    def phase_totals(self):
+        totals = {}
+        for record in self.records:
+            totals[record['phase']] = totals.get(record['phase'], 0) + record['seconds']
+        return totals
+
+    def to_json(self):
+        return {
+            'records': sorted(self.records, key=lambda record: -record['seconds']),
+            'phases': self.phase_totals(),
+        }
+
+    def dump_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, indent=1)
+
+    def table(self):
+        """
+        Returns the records as a text table, slowest first, followed by the
+        total time of each phase.
+        """
+        rows = [(
+            record['phase'],
+            record['name'],
+            '{:.2f}'.format(record['seconds'] * 1000),
+            '{:,.1f}'.format(record['bytes'] / 1024),
+        ) for record in sorted(self.records, key=lambda record: -record['seconds'])]
+        rows += [('total', phase, '{:.2f}'.format(seconds * 1000), '')
+            for phase, seconds in sorted(self.phase_totals().items(), key=lambda item: -item[1])]
+        header = ('phase', 'mod/module', 'ms', 'KiB')
+        return pysweep.profile.text_table(header, rows)
+
+    def report(self):
+        """
+        Print the table, and write it as JSON too if there's a json_path.
+        Called by PySweep once every mod has started. Tracing stops here if
+        we started it, so the rest of the session doesn't pay for it.
+        """
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+        print()
+        print("Startup profile:")
+        print(self.table())
+        if self.json_path is not None:
+            self.dump_json(self.json_path)
+            print("Wrote startup profile to {}".format(self.json_path))
+
+def from_environment():
+    value = os.environ.get(ENVIRONMENT_VARIABLE)
+    if not value or value == '0':
+        return None
+    return StartupProfiler(None if value == '1' else value)
+
+profiler = from_environment()
+
+def measure(name, phase):
+    """
+    profiler.measure(name, phase), or a with block that does nothing if
+    startup profiling is off.
+    """
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.measure(name, phase)
+
+def report():
+    if profiler is not None:
+        profiler.report()
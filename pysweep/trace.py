@@ -0,0 +1,104 @@
+"""
+Export what listeners did as a Chrome trace-event file, which can be opened
+in chrome://tracing or https://ui.perfetto.dev and viewed as a flame chart.
+"""
+
+import json, os, threading, time
+
+from pysweep.profile import listener_name
+
+class ChromeTracer:
+    """
+    An instrument (see PySweep.add_instrument) that records the start and end
+    of every listener call, along with the trigger and the EventNode sequence
+    numbers of the event and the event that caused it.
+
+    Records are buffered and written to the file every chunk_size calls, so
+    traces of long sessions never have to fit in memory. Call close() to
+    finish the file.
+    """
+    def __init__(self, path, chunk_size=10000):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        self.origin = time.perf_counter_ns()
+        self.file = open(path, 'w')
+        self.file.write('[')
+        self.empty = True
+        self.write([
+            {'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'args': {'name': 'PySweeper'}},
+            {'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': self.tid, 'args': {'name': 'Tk'}},
+        ])
+
+    def wrap(self, modname, trigger, listener):
+        triggername = '{}.{}'.format(modname, trigger)
+        name = listener_name(listener)
+        buffer = self.buffer
+        clock = time.perf_counter_ns
+        def traced(event):
+            # Nodes only hold a weak reference to their parent, which may be
+            # gone by the time the buffer is flushed, so read it now.
+            node = event.pysweep_node
+            if node is None:
+                causality = None
+            else:
+                parent = node.parent
+                if parent is None:
+                    causality = (node.seq, None)
+                else:
+                    causality = (node.seq, (parent.seq, parent.modname, parent.name))
+            start = clock()
+            try:
+                listener(event)
+            finally:
+                buffer.append((name, triggername, start, clock(), causality))
+                if len(buffer) >= self.chunk_size:
+                    self.flush()
+        return traced
+
+    def flush(self):
+        if self.file is None:
+            return
+        records = []
+        for name, triggername, start, end, causality in self.buffer:
+            args = {'trigger': triggername}
+            if causality is not None:
+                seq, parent = causality
+                args['seq'] = seq
+                if parent is not None:
+                    parentseq, parentmod, parentname = parent
+                    args['parent'] = parentseq
+                    args['cause'] = '{}.{}'.format(parentmod, parentname)
+            records.append({
+                'name': name,
+                'cat': triggername,
+                'ph': 'X',
+                'ts': (start - self.origin) / 1000,
+                'dur': (end - start) / 1000,
+                'pid': self.pid,
+                'tid': self.tid,
+                'args': args,
+            })
+        self.buffer.clear()
+        self.write(records)
+
+    def write(self, records):
+        for record in records:
+            if not self.empty:
+                self.file.write(',')
+            self.empty = False
+            self.file.write('\n')
+            self.file.write(json.dumps(record))
+
+    def close(self):
+        """
+        Write out what's left and finish the file.
+        """
+        if self.file is None:
+            return
+        self.flush()
+        self.file.write('\n]\n')
+        self.file.close()
+        self.file = None